@@ -49,6 +49,9 @@ class DiskUtilityWidget(Gtk.Box):
         )
 
         self.selected_disk = None
+        # Set by the installation template while it partitions, so privileged
+        # calls made on its behalf go through its root helper (see priv_helper.py)
+        self.priv_helper = None
         
         scrolled_window = Gtk.ScrolledWindow(vexpand=True)
         scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
@@ -1704,13 +1707,11 @@ class DiskUtilityWidget(Gtk.Box):
             # Create backup of current /etc/fstab
             if os.path.exists("/etc/fstab"):
                 backup_path = f"/etc/fstab.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                cmd = ['sudo', 'cp', '/etc/fstab', backup_path]
-                subprocess.run(cmd, check=True, timeout=10)
+                self._run_privileged(['cp', '/etc/fstab', backup_path], timeout=10).check_returncode()
                 print(f"Backed up /etc/fstab to {backup_path}")
             
             # Copy generated fstab to /etc/fstab
-            cmd = ['sudo', 'cp', fstab_path, '/etc/fstab']
-            process = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            process = self._run_privileged(['cp', fstab_path, '/etc/fstab'], timeout=10)
             if process.returncode != 0:
                 print(f"Failed to copy fstab to /etc/fstab: {process.stderr}")
             else:
@@ -1719,11 +1720,16 @@ class DiskUtilityWidget(Gtk.Box):
         except Exception as e:
             print(f"Error updating /etc/fstab: {e}")
 
+    def _run_privileged(self, args, timeout=None):
+        """Run a command as root through the active helper, or sudo when there is none"""
+        if self.priv_helper is not None:
+            return self.priv_helper.run(args, timeout=timeout)
+        return subprocess.run(['sudo'] + list(args), capture_output=True, text=True, timeout=timeout)
+
     def _get_filesystem_type(self, device):
         """Get filesystem type of a device using blkid"""
         try:
-            cmd = ['sudo', 'blkid', '-o', 'value', '-s', 'TYPE', device]
-            process = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            process = self._run_privileged(['blkid', '-o', 'value', '-s', 'TYPE', device], timeout=10)
             if process.returncode == 0:
                 return process.stdout.strip()
         except Exception:
@@ -1733,8 +1739,7 @@ class DiskUtilityWidget(Gtk.Box):
     def _get_device_uuid(self, device):
         """Get UUID of a device using blkid"""
         try:
-            cmd = ['sudo', 'blkid', '-o', 'value', '-s', 'UUID', device]
-            process = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            process = self._run_privileged(['blkid', '-o', 'value', '-s', 'UUID', device], timeout=10)
             if process.returncode == 0:
                 uuid = process.stdout.strip()
                 return uuid if uuid else None
@@ -1761,7 +1766,6 @@ class DiskUtilityWidget(Gtk.Box):
     def _save_partition_config(self):
         """Save partition configuration to file"""
         try:
-            import json
             # Ensure directory exists
             config_dir = "/tmp/installer_config"
             os.makedirs(config_dir, exist_ok=True)
@@ -1769,11 +1773,20 @@ class DiskUtilityWidget(Gtk.Box):
             # Save configuration to /tmp/installer_config
             config_path = os.path.join(config_dir, ".disk_utility_config.json")
             
+            # Serialize up front so the file gets a single write
+            data = json.dumps(self.partition_config, indent=2)
             with open(config_path, 'w') as f:
-                json.dump(self.partition_config, f, indent=2)
+                f.write(data)
         except Exception as e:
             print(f"Error saving config: {e}")
 
+    def apply_partition_config(self, partition_config, selected_disk):
+        """Replace the partition configuration, then save it and regenerate fstab once"""
+        self.partition_config = partition_config
+        self.selected_disk = selected_disk
+        self._save_partition_config()
+        self._generate_and_apply_fstab()
+
     def get_generated_fstab_path(self):
         """Get the path to the generated fstab file"""
         return "/tmp/installer_config/etc/fstab"
@@ -1891,26 +1904,24 @@ class DiskUtilityWidget(Gtk.Box):
         with tempfile.TemporaryDirectory() as tmpdir:
             # Mount the top-level volume explicitly so subvolumes are created at
             # the filesystem root regardless of any default-subvolume setting.
-            mount_proc = subprocess.run(
-                ['sudo', 'mount', '-t', 'btrfs', '-o', 'subvolid=5', device, tmpdir],
-                capture_output=True, text=True, timeout=30
+            mount_proc = self._run_privileged(
+                ['mount', '-t', 'btrfs', '-o', 'subvolid=5', device, tmpdir], timeout=30
             )
             if mount_proc.returncode != 0:
                 raise Exception(f"Failed to mount Btrfs {device}: {mount_proc.stderr}")
 
             try:
                 for subvol in subvols:
-                    proc = subprocess.run(
-                        ['sudo', 'btrfs', 'subvolume', 'create', f"{tmpdir}/{subvol}"],
-                        capture_output=True, text=True, timeout=30
+                    proc = self._run_privileged(
+                        ['btrfs', 'subvolume', 'create', f"{tmpdir}/{subvol}"], timeout=30
                     )
                     if proc.returncode != 0:
                         raise Exception(f"Failed to create subvolume {subvol}: {proc.stderr}")
                     print(f"Created Btrfs subvolume {subvol}")
             finally:
                 time.sleep(1)
-                subprocess.run(['sudo', 'sync'], capture_output=True)
-                subprocess.run(['sudo', 'umount', tmpdir], capture_output=True, text=True, timeout=30)
+                self._run_privileged(['sync'])
+                self._run_privileged(['umount', tmpdir], timeout=30)
 
     def _format_partition_sync(self, device, filesystem):
         """Format a partition synchronously"""
@@ -153,4 +153,83 @@ class DiskUtils:
     def is_whole_disk(device_path):
         """Check if a device path represents a whole disk or a partition"""
         disk_info = DiskUtils.parse_disk_path(device_path)
-        return disk_info and disk_info['partition_num'] is None
\ No newline at end of file
+        return disk_info and disk_info['partition_num'] is None
+
+    @staticmethod
+    def _read_sysfs_value(path, default=None):
+        """Read a single-line sysfs attribute, returning default if missing"""
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return default
+
+    @staticmethod
+    def _read_labels(by_label_dir='/dev/disk/by-label'):
+        """Map kernel device names to filesystem labels via udev's by-label symlinks"""
+        labels = {}
+        try:
+            entries = list(os.scandir(by_label_dir))
+        except OSError:
+            return labels
+        for entry in entries:
+            try:
+                target = os.path.basename(os.readlink(entry.path))
+            except OSError:
+                continue
+            # udev escapes unsafe characters as \xNN in link names
+            labels[target] = re.sub(r'\\x([0-9a-fA-F]{2})',
+                                    lambda m: chr(int(m.group(1), 16)), entry.name)
+        return labels
+
+    @staticmethod
+    def list_block_devices(sys_block='/sys/block'):
+        """
+        Enumerate disks and their partitions straight from sysfs.
+
+        Returns the same shape as 'lsblk -J -b -o NAME,SIZE,LABEL,TYPE,PKNAME,START'
+        ('blockdevices' entries with nested 'children'), without forking lsblk
+        and re-parsing its JSON. Only physical disks are reported: loop, ram,
+        zram, device-mapper, md and optical devices are skipped.
+
+        Raises:
+            OSError: if sys_block cannot be read.
+        """
+        labels = DiskUtils._read_labels()
+        read = DiskUtils._read_sysfs_value
+        devices = []
+
+        for disk in sorted(os.scandir(sys_block), key=lambda e: e.name):
+            name = disk.name
+            if name.startswith(('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'fd')):
+                continue
+            if not os.path.exists(os.path.join(disk.path, 'device')):
+                continue
+
+            children = []
+            for part in os.scandir(disk.path):
+                part_num = read(os.path.join(part.path, 'partition'))
+                if part_num is None:
+                    continue
+                children.append((int(part_num), {
+                    'name': part.name,
+                    'size': int(read(os.path.join(part.path, 'size'), '0')) * 512,
+                    'label': labels.get(part.name),
+                    'type': 'part',
+                    'pkname': name,
+                    'start': int(read(os.path.join(part.path, 'start'), '0')),
+                }))
+
+            node = {
+                'name': name,
+                'size': int(read(os.path.join(disk.path, 'size'), '0')) * 512,
+                'label': labels.get(name),
+                'type': 'disk',
+                'pkname': None,
+                'start': None,
+            }
+            if children:
+                node['children'] = [child for _num, child in sorted(children, key=lambda c: c[0])]
+            devices.append(node)
+
+        return {'blockdevices': devices}
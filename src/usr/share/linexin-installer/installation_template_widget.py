@@ -1,19 +1,49 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 import gi
 import json
+import logging
+import shutil
 import subprocess
 import re
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, GLib, GObject, Gio, Gdk
 from simple_localization_manager import get_localization_manager
+from priv_helper import PrivilegedHelper
+from disk_utils import DiskUtils
 _ = get_localization_manager().get_text
 
+# Partition detection trace, mirrored to stdout. The file is only opened when the
+# first record reaches it, and per-device traces are DEBUG so they are neither
+# formatted nor written at the default INFO level.
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.StreamHandler(sys.stdout))
+logger.addHandler(logging.FileHandler("/tmp/installer_debug.log", mode="w", delay=True))
+
+# Partitioning tools, resolved once instead of through PATH on every call
+_PARTED = shutil.which('parted') or '/usr/bin/parted'
+_PARTPROBE = shutil.which('partprobe') or '/usr/bin/partprobe'
+_SFDISK = shutil.which('sfdisk') or '/usr/bin/sfdisk'
+_UDEVADM = shutil.which('udevadm') or '/usr/bin/udevadm'
+_MKFS_VFAT = shutil.which('mkfs.vfat') or '/usr/bin/mkfs.vfat'
+_MKFS_EXT4 = shutil.which('mkfs.ext4') or '/usr/bin/mkfs.ext4'
+_MKFS_BTRFS = shutil.which('mkfs.btrfs') or '/usr/bin/mkfs.btrfs'
+_BLOCKDEV = shutil.which('blockdev') or '/usr/bin/blockdev'
+_LSBLK = shutil.which('lsblk') or '/usr/bin/lsblk'
+_BLKDISCARD = shutil.which('blkdiscard') or '/usr/bin/blkdiscard'
+
+# Trailing partition number of a device name (sda3 -> 3, nvme0n1p3 -> 3)
+_PART_NUM_RE = re.compile(r'(\d+)$')
+
 class InstallationTemplateWidget(Gtk.Box):
     """
     A GTK widget for selecting installation templates during system installation.
@@ -25,6 +55,9 @@ class InstallationTemplateWidget(Gtk.Box):
         'continue-to-next-page': (GObject.SignalFlags.RUN_FIRST, None, ())
     }
 
+    # Current partitioning status, bound to the progress dialog's body
+    status = GObject.Property(type=str, default="")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         get_localization_manager().register_widget(self)
@@ -46,6 +79,18 @@ class InstallationTemplateWidget(Gtk.Box):
         # Advanced Setup: swap file on the root filesystem. Enabled at 4 GB by default.
         self.swap_enabled = True
         self.swap_size_gb = 4
+        # Firmware boot mode cannot change while the installer runs, so probe it once
+        self._boot_mode = self._detect_boot_mode()
+        # Progress/error dialogs are built on first use and then reused
+        self._progress_dialog_template = None
+        self._error_dialog_template = None
+        # Partitioning status text: written by the worker thread, shown by _flush_status
+        self._pending_status = None
+        self._status_source = None
+        self._status_lock = threading.Lock()
+        # Long-lived workers for partitioning runs (retries reuse the same thread).
+        # The second slot lets a run overlap the final udev settle with its config writes.
+        self._worker = ThreadPoolExecutor(max_workers=2, thread_name_prefix="partitioning")
 
         # Connect map signal to refresh data when widget becomes visible
         self.connect("map", self._on_map)
@@ -558,126 +603,115 @@ class InstallationTemplateWidget(Gtk.Box):
     def _detect_partitions(self):
         """Detect partitions, Free Space, and Whole Disks > 25GB"""
         self.partitions = []
-        
-        # Debug logging setup
-        try:
-            log_file = open("/tmp/installer_debug.log", "w")
-            def log(msg):
-                print(msg) # Still print to stdout for redundancy
-                log_file.write(msg + "\n")
-                log_file.flush()
-        except Exception:
-            def log(msg): print(msg)
 
-        log("--- Starting Partition Detection ---")
+        logger.info("--- Starting Partition Detection ---")
         
         try:
-            # 1. Standard Partition Detection (lsblk)
-            # Added -b to get size in bytes directly
-            cmd = ['lsblk', '-J', '-b', '-o', 'NAME,SIZE,FSTYPE,LABEL,MOUNTPOINT,TYPE,PKNAME,START']
-            log(f"Running: {' '.join(cmd)}")
-            process = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
+            # 1. Standard Partition Detection (sysfs, lsblk as fallback)
+            try:
+                block_devices = DiskUtils.list_block_devices()
+            except OSError as e:
+                logger.warning("sysfs scan failed (%s), falling back to lsblk", e)
+                block_devices = None
+
+            if block_devices is None:
+                # Added -b to get size in bytes directly
+                cmd = ['lsblk', '-J', '-b', '-o', 'NAME,SIZE,FSTYPE,LABEL,MOUNTPOINT,TYPE,PKNAME,START']
+                logger.info("Running: %s", ' '.join(cmd))
+                process = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+                if process.returncode == 0:
+                    try:
+                        block_devices = json.loads(process.stdout)
+                    except json.JSONDecodeError as e:
+                        logger.error("JSON Decode Error: %s", e)
+                        logger.error("Output: %s", process.stdout)
+                else:
+                    logger.error("lsblk failed: %s", process.stderr)
+
             parent_disks = set()
 
-            def _process_node(node, root_parent_disk):
-                """Recursive helper to process partitions"""
-                # If we encounter a disk at top level, track it
-                if node.get('type') == 'disk':
-                    disk_path = f"/dev/{node['name']}"
-                    parent_disks.add(disk_path)
-                    log(f"Found disk: {disk_path}")
-                    if root_parent_disk is None:
-                        root_parent_disk = disk_path
-                    
-                    # CHECK FOR WHOLE DISK (No partitions)
-                    # If this disk has no children that are partitions, treat as raw disk
-                    has_partitions = False
-                    if 'children' in node:
-                         for child in node['children']:
-                             if child.get('type') == 'part':
-                                 has_partitions = True
-                                 break
-                    
-                    if not has_partitions:
-                        # Process as Whole Disk
+            # Loop invariants, hoisted out of the per-node walk below
+            partitions = self.partitions
+            wholedisk_label = _("Whole Disk ({})")
+
+            def _walk_nodes(roots):
+                """Iterative pre-order walk over the block device tree"""
+                # (node, root_parent_disk) pairs; reversed so children pop in lsblk order
+                stack = [(root, None) for root in reversed(roots)]
+                while stack:
+                    node, root_parent_disk = stack.pop()
+                    node_type = node.get('type')
+                    children = node.get('children') or ()
+
+                    if node_type == 'disk':
+                        disk_path = f"/dev/{node['name']}"
+                        parent_disks.add(disk_path)
+                        logger.debug("Found disk: %s", disk_path)
+                        if root_parent_disk is None:
+                            root_parent_disk = disk_path
+
+                        # CHECK FOR WHOLE DISK (No partitions)
+                        # If this disk has no children that are partitions, treat as raw disk
+                        if not any(child.get('type') == 'part' for child in children):
+                            try:
+                                size_bytes = int(node.get('size', 0))
+                            except (ValueError, TypeError):
+                                size_bytes = 0
+
+                            size_gb = size_bytes // (1024**3)
+
+                            logger.debug("Checking Whole Disk %s: Size=%sGB", disk_path, size_gb)
+                            logger.debug("  -> ACCEPTED Whole Disk %s", disk_path)
+                            partitions.append({
+                                'type': 'wholedisk',
+                                'device': disk_path,
+                                'name': node['name'],
+                                'display_name': wholedisk_label.format(node['name']),
+                                'size_gb': size_gb,
+                                'size_sectors': size_bytes // 512,
+                                'start_sector': 2048, # Default start for raw disk
+                                'parent_disk': disk_path
+                            })
+
+                    elif node_type == 'part':
+                        part_path = f"/dev/{node['name']}"
+
+                        # Determine parent disk
+                        parent_disk_path = root_parent_disk
+                        if not parent_disk_path and node.get('pkname'):
+                            parent_disk_path = f"/dev/{node['pkname']}"
+
+                        # Size is already in bytes
                         try:
                             size_bytes = int(node.get('size', 0))
                         except (ValueError, TypeError):
                             size_bytes = 0
-                        
+
                         size_gb = size_bytes // (1024**3)
-                        size_sectors = size_bytes // 512
-                        
-
-                        log(f"Checking Whole Disk {disk_path}: Size={size_gb}GB")
-                        
-                        log(f"  -> ACCEPTED Whole Disk {disk_path}")
-                        self.partitions.append({
-                            'type': 'wholedisk',
-                            'device': disk_path,
+
+                        logger.debug("Checking partition %s: Size=%sGB (%s bytes), Parent=%s",
+                                     part_path, size_gb, size_bytes, parent_disk_path)
+                        logger.debug("  -> ACCEPTED %s", part_path)
+                        partitions.append({
+                            'type': 'partition',
+                            'device': part_path,
                             'name': node['name'],
-                            'display_name': _("Whole Disk ({})").format(node['name']),
+                            'display_name': node.get('label') or node.get('name'),
                             'size_gb': size_gb,
-                            'size_sectors': size_sectors,
-                            'start_sector': 2048, # Default start for raw disk
-                            'parent_disk': disk_path
+                            'size_sectors': size_bytes // 512,
+                            'start_sector': node.get('start'),
+                            'parent_disk': parent_disk_path
                         })
 
+                    stack.extend((child, root_parent_disk) for child in reversed(children))
 
-                # If it is a partition, process it
-                if node.get('type') == 'part':
-                    part_path = f"/dev/{node['name']}"
-                    
-                    # Determine parent disk
-                    parent_disk_path = root_parent_disk
-                    if not parent_disk_path and node.get('pkname'):
-                         parent_disk_path = f"/dev/{node['pkname']}"
-
-                    # Get size directly from lsblk JSON
-                    try:
-                        size_bytes = int(node.get('size', 0))
-                    except (ValueError, TypeError):
-                        size_bytes = 0
-                        
-                    size_gb = size_bytes // (1024**3)
-                    size_sectors = size_bytes // 512
-
-                    log(f"Checking partition {part_path}: Size={size_gb}GB ({size_bytes} bytes), Parent={parent_disk_path}")
-
-                    log(f"  -> ACCEPTED {part_path}")
-                    self.partitions.append({
-                        'type': 'partition',
-                        'device': part_path,
-                        'name': node['name'],
-                        'display_name': node.get('label') or node.get('name'),
-                        'size_gb': size_gb,
-                        'size_sectors': size_sectors,
-                        'start_sector': node.get('start'),
-                        'parent_disk': parent_disk_path
-                    })
-
-
-                # Recurse into children
-                if 'children' in node:
-                    for child in node['children']:
-                        _process_node(child, root_parent_disk)
-
-            if process.returncode == 0:
-                try:
-                    data = json.loads(process.stdout)
-                    for device in data.get('blockdevices', []):
-                        _process_node(device, None)
-                except json.JSONDecodeError as e:
-                     log(f"JSON Decode Error: {e}")
-                     log(f"Output: {process.stdout}")
-            else:
-                 log(f"lsblk failed: {process.stderr}")
+            if block_devices:
+                _walk_nodes(block_devices.get('blockdevices', []))
 
             # 2. Free Space Detection (parted)
             for parent_disk in parent_disks:
                 try:
-                    log(f"Scanning free space on {parent_disk}")
+                    logger.info("Scanning free space on %s", parent_disk)
                     # Output machine readable, unit sectors
                     p_cmd = ['sudo', 'parted', '-m', parent_disk, 'unit', 's', 'print', 'free']
                     p_proc = subprocess.run(p_cmd, capture_output=True, text=True)
@@ -701,11 +735,11 @@ class InstallationTemplateWidget(Gtk.Box):
                                 size_gb = (size_sectors * 512) // (1024**3)
                                 size_mb = (size_sectors * 512) // (1024**2)
                                 
-                                log(f"Checking Free Space on {parent_disk}: Size={size_gb}GB ({size_mb} MB)")
+                                logger.debug("Checking Free Space on %s: Size=%sGB (%s MB)", parent_disk, size_gb, size_mb)
 
                                 # Filter out tiny gaps (alignment issues), show only meaningful free space (>256MB)
                                 if size_mb >= 256:
-                                    log(f"  -> ACCEPTED Free Space")
+                                    logger.debug("  -> ACCEPTED Free Space")
                                     self.partitions.append({
                                         'type': 'freespace',
                                         'device': 'Unallocated Space',
@@ -717,19 +751,13 @@ class InstallationTemplateWidget(Gtk.Box):
                                         'parent_disk': parent_disk
                                     })
                                 else:
-                                    log(f"  -> REJECTED Free Space (Too small: {size_mb} MB)")
+                                    logger.debug("  -> REJECTED Free Space (Too small: %s MB)", size_mb)
 
                 except Exception as e:
-                    log(f"Failed to scan free space on {parent_disk}: {e}")
+                    logger.warning("Failed to scan free space on %s: %s", parent_disk, e)
 
-        except Exception as e:
-            log(f"Error in detection: {e}")
-            import traceback
-            log(traceback.format_exc())
-            
-        try:
-            log_file.close()
-        except: pass
+        except Exception:
+            logger.exception("Error in detection")
 
     def _create_partition_cards(self):
         if not self.partitions:
@@ -847,11 +875,11 @@ class InstallationTemplateWidget(Gtk.Box):
 
         # Show the progress dialog immediately on the main thread
         self.progress_dialog = self._show_progress_dialog(_("Partitioning"), _("Preparing disk..."))
+        self._pending_status = None
+        self._status_source = None
         
-        # Start the heavy lifting in a separate thread
-        thread = threading.Thread(target=self._split_and_format_partition_thread, args=(disk_utility_widget,))
-        thread.daemon = True
-        thread.start()
+        # Start the heavy lifting on the worker thread
+        self._worker.submit(self._split_and_format_partition_thread, disk_utility_widget)
         return True
 
     def _detect_boot_mode(self):
@@ -866,8 +894,13 @@ class InstallationTemplateWidget(Gtk.Box):
 
     def _split_and_format_partition_thread(self, disk_utility_widget):
         """Background thread logic: Delete -> Create (Limited Size) -> Format"""
+        # One authenticated root helper serves every privileged call below
+        priv = PrivilegedHelper()
+        priv.start()
+        # Btrfs subvolume creation and fstab generation run on the same helper
+        disk_utility_widget.priv_helper = priv
         try:
-            boot_mode = self._detect_boot_mode()
+            boot_mode = self._boot_mode
             
             parent_disk = self.selected_partition['parent_disk']
             target_device = self.selected_partition['device']
@@ -883,12 +916,13 @@ class InstallationTemplateWidget(Gtk.Box):
 
             # --- STEP A: INITIALIZE DISK IF NEEDED ---
             if item_type == 'wholedisk':
-                GLib.idle_add(self.progress_dialog.set_body, _("Initializing disk partition table..."))
+                self._set_status(_("Initializing disk partition table..."))
                 label_type = "gpt" if boot_mode == "uefi" else "msdos"
                 
                 # Create fresh partition table
-                subprocess.run(['sudo', 'parted', '-s', parent_disk, 'mklabel', label_type], check=True)
-                subprocess.run(['sudo', 'partprobe', parent_disk])
+                self._require_success(priv.run([_PARTED, '-s', parent_disk, 'mklabel', label_type]),
+                                      "Creating partition table")
+                priv.run([_PARTPROBE, parent_disk])
                 time.sleep(1)
                 
                 # Start sector 2048 is safe for new tables
@@ -898,24 +932,23 @@ class InstallationTemplateWidget(Gtk.Box):
 
             # --- STEP B: CLEANUP (If it's an existing partition) ---
             if item_type == 'partition':
-                GLib.idle_add(self.progress_dialog.set_body, _("Unmounting partition..."))
-                subprocess.run(['sudo', 'umount', target_device], capture_output=True)
-                subprocess.run(['sudo', 'umount', f"{target_device}*"], capture_output=True)
-                subprocess.run(['sudo', 'swapoff', '-a'], capture_output=True)
+                self._set_status(_("Unmounting partition..."))
+                priv.run(['umount', target_device])
+                priv.run(['umount', f"{target_device}*"])
+                priv.run(['swapoff', '-a'])
 
                 # Delete Old Partition
-                part_num = None
-                match = re.search(r'(\d+)$', target_device)
-                if match: part_num = match.group(1)
+                part_num = self._partition_number(target_device, parent_disk)
 
                 if part_num:
-                    GLib.idle_add(self.progress_dialog.set_body, _("Removing old partition..."))
-                    subprocess.run(['sudo', 'sfdisk', '--delete', parent_disk, part_num], check=True)
-                    subprocess.run(['sudo', 'partprobe', parent_disk])
+                    self._set_status(_("Removing old partition..."))
+                    self._require_success(priv.run([_SFDISK, '--delete', parent_disk, part_num]),
+                                          "Removing old partition")
+                    priv.run([_PARTPROBE, parent_disk])
                     time.sleep(1)
 
             # --- STEP C: CREATION ---
-            GLib.idle_add(self.progress_dialog.set_body, _("Creating new partitions..."))
+            self._set_status(_("Creating new partitions..."))
             
             sfdisk_script = ""
             # 2 GB ESP for every install. Btrfs snapshots keep per-snapshot kernel
@@ -955,60 +988,60 @@ class InstallationTemplateWidget(Gtk.Box):
                 )
 
             # Use --force to ensure we can write to the gap exactly
-            sfdisk_proc = subprocess.run(
-                ['sudo', 'sfdisk', '--append', '--force', parent_disk],
-                input=sfdisk_script,
-                text=True,
-                capture_output=True
+            sfdisk_proc = priv.run(
+                [_SFDISK, '--append', '--force', parent_disk],
+                input=sfdisk_script
             )
 
             if sfdisk_proc.returncode != 0:
                 raise Exception(f"Partition creation failed: {sfdisk_proc.stderr}")
 
             # Sync
-            GLib.idle_add(self.progress_dialog.set_body, _("Synchronizing disks..."))
-            subprocess.run(['sudo', 'partprobe', parent_disk])
-            subprocess.run(['sudo', 'udevadm', 'settle'], check=False)
+            self._set_status(_("Synchronizing disks..."))
+            priv.run([_PARTPROBE, parent_disk])
+            priv.run([_UDEVADM, 'settle'])
             time.sleep(2) 
 
             # --- STEP C: IDENTIFICATION ---
-            GLib.idle_add(self.progress_dialog.set_body, _("Verifying partitions..."))
+            self._set_status(_("Verifying partitions..."))
             
-            chk_cmd = ['sudo', 'sfdisk', '-l', '-o', 'DEVICE,START,TYPE', '-J', parent_disk]
+            # One lsblk query is the source of truth for every lookup below. Ask the
+            # kernel to re-read the table first (EBUSY on an in-use disk is fine,
+            # partprobe already informed it).
+            priv.run([_BLOCKDEV, '--rereadpt', parent_disk])
+            chk_cmd = [_LSBLK, '--json', '--bytes', '--output', 'NAME,PATH,START,SIZE,PARTLABEL,PARTFLAGS', parent_disk]
             chk_proc = subprocess.run(chk_cmd, capture_output=True, text=True)
-            part_table = json.loads(chk_proc.stdout)
-            partitions = part_table.get('partitiontable', {}).get('partitions', [])
+            block_devices = json.loads(chk_proc.stdout).get('blockdevices') or [{}]
+            # lsblk's JSON already types START as a number; keep (start, path) pairs
+            partitions = [
+                (p['start'], p['path'])
+                for p in block_devices[0].get('children', [])
+                if isinstance(p.get('start'), int) and p.get('path')
+            ]
             
             new_efi_device = None
             new_root_device = None
             SECTOR_TOLERANCE = 8192 
-
-            if boot_mode == "uefi":
-                for p in partitions:
-                    try:
-                        p_start = int(p.get('start', -1))
-                        p_node = p.get('node') or p.get('device')
-                        if not p_node: continue
-
-                        if abs(p_start - start_sector) < SECTOR_TOLERANCE:
-                            new_efi_device = p_node
-                        
-                        expected_root = start_sector + EFI_SIZE_SECTORS
-                        if abs(p_start - expected_root) < SECTOR_TOLERANCE:
-                            new_root_device = p_node
-                    except ValueError: continue
-            else:
-                for p in partitions:
-                    try:
-                        p_start = int(p.get('start', -1))
-                        p_node = p.get('node') or p.get('device')
-                        if p_node and abs(p_start - start_sector) < SECTOR_TOLERANCE:
-                            new_root_device = p_node
-                    except ValueError: continue
-                
+            # Partition flag changes, applied with a single parted call below
+            flag_ops = []
+
+            # Single pass: on UEFI the EFI partition sits at start_sector and Root
+            # follows it, on legacy Root itself sits at start_sector.
+            is_uefi = boot_mode == "uefi"
+            expected_root = start_sector + EFI_SIZE_SECTORS if is_uefi else start_sector
+            for p_start, p_node in partitions:
+                if is_uefi and abs(p_start - start_sector) < SECTOR_TOLERANCE:
+                    new_efi_device = p_node
+                if abs(p_start - expected_root) < SECTOR_TOLERANCE:
+                    new_root_device = p_node
+                # Stop as soon as every partition we created has been found
+                if new_root_device and (new_efi_device or not is_uefi):
+                    break
+
+            if not is_uefi:
                 if new_root_device:
-                    new_num = ''.join(filter(str.isdigit, os.path.basename(new_root_device)))
-                    subprocess.run(['sudo', 'parted', '-s', parent_disk, 'set', new_num, 'boot', 'on'], check=True)
+                    new_num = self._partition_number(new_root_device, parent_disk)
+                    flag_ops += ['set', new_num, 'boot', 'on']
 
             # Verification
             if boot_mode == "uefi" and (not new_efi_device or not new_root_device):
@@ -1016,15 +1049,38 @@ class InstallationTemplateWidget(Gtk.Box):
             elif boot_mode == "legacy" and not new_root_device:
                 raise Exception("Detection failed for Root partition.")
 
+            if flag_ops:
+                self._require_success(priv.run([_PARTED, '-s', parent_disk] + flag_ops),
+                                      "Setting partition flags")
+
             # --- STEP D: FORMATTING ---
+            # -q: the output is captured, so skip mkfs's per-group progress reporting
+            # Root is trimmed up front with one blkdiscard (fails harmlessly on
+            # disks without TRIM), so mkfs is told not to discard again. ext4 also
+            # defers inode table and journal zeroing to the kernel after mount.
+            priv.run([_BLKDISCARD, new_root_device])
+            if self.use_btrfs:
+                root_filesystem = 'btrfs'
+                root_mkfs = [_MKFS_BTRFS, '-q', '-f', '--nodiscard', new_root_device]
+            else:
+                root_filesystem = 'ext4'
+                root_mkfs = [_MKFS_EXT4, '-q', '-F',
+                             '-E', 'nodiscard,lazy_itable_init=1,lazy_journal_init=1',
+                             new_root_device]
+
             if boot_mode == "uefi":
-                GLib.idle_add(self.progress_dialog.set_body, _("Formatting EFI partition..."))
-                subprocess.run(['sudo', 'mkfs.vfat', '-F32', new_efi_device], check=True)
+                # EFI and Root are separate block devices, so format them concurrently
+                self._set_status(_("Formatting partitions..."))
+                for result in priv.run_many([[_MKFS_VFAT, '-F32', new_efi_device], root_mkfs]):
+                    self._require_success(result, "Formatting")
+            else:
+                if self.use_btrfs:
+                    self._set_status(_("Formatting Root partition (Btrfs)..."))
+                else:
+                    self._set_status(_("Formatting Root partition..."))
+                self._require_success(priv.run(root_mkfs), "Formatting Root partition")
 
             if self.use_btrfs:
-                GLib.idle_add(self.progress_dialog.set_body, _("Formatting Root partition (Btrfs)..."))
-                subprocess.run(['sudo', 'mkfs.btrfs', '-f', new_root_device], check=True)
-
                 # Decide the subvolume layout. When the user assigned a separate
                 # /home partition we only need @ for the root; otherwise /home
                 # lives on its own @home subvolume. The disk utility's fstab
@@ -1041,30 +1097,26 @@ class InstallationTemplateWidget(Gtk.Box):
                     btrfs_subvols['@swap'] = '/swap'
                 disk_utility_widget.btrfs_subvolumes = btrfs_subvols
 
-                GLib.idle_add(self.progress_dialog.set_body, _("Creating Btrfs subvolumes..."))
+                self._set_status(_("Creating Btrfs subvolumes..."))
                 disk_utility_widget._create_btrfs_subvolumes(new_root_device)
-                root_filesystem = 'btrfs'
-            else:
-                GLib.idle_add(self.progress_dialog.set_body, _("Formatting Root partition..."))
-                subprocess.run(['sudo', 'mkfs.ext4', '-F', new_root_device], check=True)
-                root_filesystem = 'ext4'
 
-            # Final Settle
-            GLib.idle_add(self.progress_dialog.set_body, _("Finalizing configuration..."))
-            subprocess.run(['sudo', 'udevadm', 'settle'], check=False)
-            time.sleep(1)
+            # Final Settle. The config below only needs device paths, which are
+            # already known, so let udev settle in the background meanwhile.
+            self._set_status(_("Finalizing configuration..."))
+            settle_future = self._worker.submit(self._settle_devices, [new_efi_device, new_root_device])
 
             # --- STEP E: CONFIG UPDATE ---
-            disk_utility_widget.partition_config = {}
+            # Built locally and handed to the disk utility in one call below
+            partition_config = {}
             if boot_mode == "uefi":
-                disk_utility_widget.partition_config[new_efi_device] = {
+                partition_config[new_efi_device] = {
                     'mountpoint': '/boot', 'bootable': True, 'filesystem': 'vfat'
                 }
-                disk_utility_widget.partition_config[new_root_device] = {
+                partition_config[new_root_device] = {
                     'mountpoint': '/', 'bootable': False, 'filesystem': root_filesystem
                 }
             else:
-                disk_utility_widget.partition_config[new_root_device] = {
+                partition_config[new_root_device] = {
                     'mountpoint': '/', 'bootable': True, 'filesystem': root_filesystem
                 }
             
@@ -1076,8 +1128,9 @@ class InstallationTemplateWidget(Gtk.Box):
                 print(f"Configuring Home Partition: {home_device} (Format: {should_format})")
                 
                 if should_format:
-                     GLib.idle_add(self.progress_dialog.set_body, _("Formatting Home partition..."))
-                     subprocess.run(['sudo', 'mkfs.ext4', '-F', home_device], check=True)
+                     self._set_status(_("Formatting Home partition..."))
+                     self._require_success(priv.run([_MKFS_EXT4, '-q', '-F', home_device]),
+                                           "Formatting Home partition")
                      filesystem = 'ext4'
                 else:
                     # Detect filesystem if not formatting, or assume auto/ext4
@@ -1085,23 +1138,21 @@ class InstallationTemplateWidget(Gtk.Box):
                     filesystem = 'auto'
                     # Try to detect actual fs for better fstab
                     try:
-                        fs_check = subprocess.run(['sudo', 'blkid', '-o', 'value', '-s', 'TYPE', home_device], capture_output=True, text=True)
+                        fs_check = priv.run(['blkid', '-o', 'value', '-s', 'TYPE', home_device])
                         if fs_check.returncode == 0 and fs_check.stdout.strip():
                             filesystem = fs_check.stdout.strip()
                     except: pass
 
-                disk_utility_widget.partition_config[home_device] = {
+                partition_config[home_device] = {
                     'mountpoint': '/home',
                     'bootable': False,
                     'filesystem': filesystem
                 }
 
-            disk_utility_widget.selected_disk = parent_disk
-
             print("Saving partition config and generating fstab...")
-            disk_utility_widget._save_partition_config()
-            disk_utility_widget._generate_and_apply_fstab()
+            disk_utility_widget.apply_partition_config(partition_config, parent_disk)
 
+            settle_future.result()
             GLib.idle_add(self._finish_success)
 
         except Exception as e:
@@ -1109,8 +1160,73 @@ class InstallationTemplateWidget(Gtk.Box):
             import traceback
             traceback.print_exc()
             GLib.idle_add(self._finish_error, str(e))
+        finally:
+            disk_utility_widget.priv_helper = None
+            priv.stop()
+
+    def _partition_number(self, device, parent_disk):
+        """Partition number of device on parent_disk (sda3 -> 3, nvme0n1p3 -> 3)"""
+        # Partitions are named after their disk, so slicing off the disk path is
+        # enough; the regex only covers names that do not follow that scheme.
+        if parent_disk and device.startswith(parent_disk):
+            number = device[len(parent_disk):].lstrip('p')
+            if number.isdigit():
+                return number
+        match = _PART_NUM_RE.search(device)
+        return match.group(1) if match else None
+
+    def _require_success(self, result, action):
+        """Turn a failed command into a partitioning error carrying its stderr"""
+        if result.returncode != 0:
+            raise Exception(f"{action} failed ({' '.join(result.args)}): {result.stderr.strip()}")
+        return result
+
+    def _settle_devices(self, devices):
+        """Wait until udev has processed the given device nodes.
+
+        'udevadm settle' drains the whole event queue, including the change
+        events mkfs triggers that create the /dev/disk/by-uuid links the
+        install step relies on. It needs no root, so this does not hold up
+        the privileged helper.
+        """
+        subprocess.run([_UDEVADM, 'settle', '--timeout=30'], capture_output=True)
+        self._wait_for_device_nodes(devices)
+
+    def _wait_for_device_nodes(self, devices, timeout=2.0):
+        """Poll until every device node exists, giving up after timeout seconds"""
+        devices = [d for d in devices if d]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(os.path.exists(d) for d in devices):
+                return True
+            time.sleep(0.05)
+        return all(os.path.exists(d) for d in devices)
+
+    def _set_status(self, text):
+        """Publish a progress message from the worker thread"""
+        # Wake the main loop only when there is something new to show
+        with self._status_lock:
+            self._pending_status = text
+            if self._status_source is None:
+                self._status_source = GLib.idle_add(self._flush_status)
+
+    def _flush_status(self):
+        """Main-loop side: show the latest progress message if it changed"""
+        with self._status_lock:
+            status = self._pending_status
+            self._status_source = None
+        if status is not None and status != self.status:
+            self.status = status
+        return False
+
+    def _stop_status_updates(self):
+        with self._status_lock:
+            if self._status_source is not None:
+                GLib.source_remove(self._status_source)
+                self._status_source = None
 
     def _finish_success(self):
+        self._stop_status_updates()
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
         if getattr(self, '_partition_success_callback', None):
@@ -1119,6 +1235,7 @@ class InstallationTemplateWidget(Gtk.Box):
             self.emit('continue-to-next-page')
 
     def _finish_error(self, error_msg):
+        self._stop_status_updates()
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
         if getattr(self, '_partition_error_callback', None):
@@ -1126,20 +1243,35 @@ class InstallationTemplateWidget(Gtk.Box):
         self._show_error_dialog(_("Partitioning Failed"), error_msg)
 
     def _show_progress_dialog(self, heading, message):
-        dialog = Adw.MessageDialog(heading=heading, body=message, transient_for=self.get_root())
-        spinner = Gtk.Spinner()
-        spinner.start()
-        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
-        box.set_halign(Gtk.Align.CENTER)
-        box.append(spinner)
-        box.append(Gtk.Label(label=_("Working...")))
-        dialog.set_extra_child(box)
+        dialog = self._progress_dialog_template
+        if dialog is None:
+            # hide-on-close keeps the dialog alive so the next call can reuse it
+            dialog = Adw.MessageDialog(hide_on_close=True)
+            spinner = Gtk.Spinner()
+            spinner.start()
+            box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+            box.set_halign(Gtk.Align.CENTER)
+            box.append(spinner)
+            box.append(Gtk.Label(label=_("Working...")))
+            dialog.set_extra_child(box)
+            # Status changes reach the body through the binding, not a Python call
+            self.bind_property('status', dialog, 'body', GObject.BindingFlags.DEFAULT)
+            self._progress_dialog_template = dialog
+        dialog.set_transient_for(self.get_root())
+        dialog.set_heading(heading)
+        self.status = message
         dialog.present()
         return dialog
 
     def _show_error_dialog(self, heading, message):
-        dialog = Adw.MessageDialog(heading=heading, body=message, transient_for=self.get_root())
-        dialog.add_response("ok", "OK")
+        dialog = self._error_dialog_template
+        if dialog is None:
+            dialog = Adw.MessageDialog(hide_on_close=True)
+            dialog.add_response("ok", "OK")
+            self._error_dialog_template = dialog
+        dialog.set_transient_for(self.get_root())
+        dialog.set_heading(heading)
+        dialog.set_body(message)
         dialog.present()
 
     # Compat properties
@@ -1296,7 +1428,7 @@ class InstallationTemplateWidget(Gtk.Box):
             return
 
         # Start with the base message from card clicked logic
-        boot_mode = self._detect_boot_mode()
+        boot_mode = self._boot_mode
         if self.selected_partition['type'] == 'wholedisk':
              if boot_mode == "uefi":
                  base_msg = _("Will split <b>{}</b> into:\n1. <b>EFI Boot</b> (2 GB)\n2. <b>Root</b> (Remaining space)").format(self.selected_partition['device'])
@@ -1,22 +1,120 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import gi
+import shlex
+import signal
 import subprocess
 import threading
 import time
 from enum import Enum
 from dataclasses import dataclass
-import queue
-from typing import List, Callable, Optional
+from collections import deque
+from itertools import groupby
+from typing import List, Tuple, Callable, Optional
 
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, GLib, Pango, GObject, Gdk
+from gi.repository import Gtk, Adw, GLib, Pango, GObject, Gdk, Gio
 from simple_localization_manager import get_localization_manager
 _ = get_localization_manager().get_text
 
+# Lines kept in the terminal view; the full log stays in log_buffer
+MAX_TERMINAL_LINES = 5000
+
+# Extra lines dropped per trim, so the view is not trimmed on every flush
+TERMINAL_TRIM_LINES = 1000
+
+# Lines kept in the saved installation log (oldest are dropped first)
+MAX_LOG_LINES = 200000
+
+# Output arriving within this window is written to the terminal in one flush
+LOG_FLUSH_INTERVAL_MS = 50
+
+# Grace period before a cancelled step's process group gets SIGKILL (via sudo)
+CANCEL_KILL_TIMEOUT_MS = 2000
+
+# Background Flatpak download: held while it runs, where it writes its output,
+# and the PID of its process group (so an aborted install can stop it)
+FLATPAK_PREFETCH_LOCK = "/tmp/linexin_installer/flatpak-prefetch.lock"
+FLATPAK_PREFETCH_LOG = "/tmp/linexin_installer/flatpak-prefetch.log"
+FLATPAK_PREFETCH_PID = "/tmp/linexin_installer/flatpak-prefetch.pid"
+
+# Step output lines that pacman, flatpak and the setup scripts start with
+# "error:"/"warning:" are colored like the installer's own messages
+_ERROR_LINE_RE = re.compile(r"(?:error|fatal)\b", re.IGNORECASE)
+_WARNING_LINE_RE = re.compile(r"warn(?:ing)?\b", re.IGNORECASE)
+
+# Printed by the step shell after each command, followed by its exit status
+STEP_DONE_MARKER = "__STEP_DONE__"
+
+# Prefixes the "STEP <n>" and "RC <n> <status>" lines of a chroot session
+SESSION_MARKER = "::LINEXIN::"
+
+# Every post-install script runs inside the new system through this prefix;
+# the "Preparing chroot" step sets up the API filesystems once for all of them
+CHROOT_PREFIX = ("sudo", "chroot", "/tmp/linexin_installer/root")
+
+# Button styling, installed on the display once per process
+_CSS_DATA = b"""
+    .back_button {
+        border-radius: 20px;
+        font-weight: bold;
+        font-size: 1em;
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+        text-shadow: 0 1px 2px rgba(0,0,0,0.1);
+    }
+    
+    .back_button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 15px alpha(@theme_bg_color, 0.3);
+    }
+    
+    .back_button:active {
+        transform: translateY(0px);
+    }
+
+    .continue_button {
+        border-radius: 20px;
+        font-weight: bold;
+        font-size: 1em;
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+        text-shadow: 0 1px 2px rgba(0,0,0,0.1);
+    }
+    
+    .continue_button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 15px alpha(@accent_color, 0.3);
+    }
+    
+    .continue_button:active {
+        transform: translateY(0px);
+    }
+    
+    @keyframes pulse {
+        0% { transform: scale(1); }
+        50% { transform: scale(1.05); }
+        100% { transform: scale(1); }
+    }
+    
+    .pulse-animation {
+        animation: pulse 2s ease-in-out infinite;
+    }
+    
+    /* Fixed terminal font so inserts don't trigger font lookups */
+    .console {
+        font-family: Monospace;
+        font-size: 10pt;
+    }
+"""
+_CSS_INSTALLED = False
+
+# Shared by every page instance instead of a fresh icon-name lookup each time
+_STATUS_ICON_GICON = Gio.ThemedIcon.new("system-run-symbolic")
+
+
 class InstallationState(Enum):
     """Enumeration of installation states."""
     IDLE = "idle"
@@ -25,15 +123,488 @@ class InstallationState(Enum):
     ERROR = "error"
     CANCELLED = "cancelled"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InstallationStep:
     """Data class representing a single installation step."""
     label: str
-    command: List[str]
+    command: Tuple[str, ...]
     description: str = ""
     weight: float = 1.0  # Weight for progress calculation
     critical: bool = True  # If True, failure stops installation
+    group: Optional[str] = None  # Consecutive steps sharing a group run in one chroot shell
+    concurrent: bool = False  # Runs alongside adjacent concurrent steps of its group
+
+    def __post_init__(self):
+        # Steps are built with list literals; store an immutable copy
+        object.__setattr__(self, "command", tuple(self.command))
+
+
+def _build_parse_fstab_function():
+    """Generate the bash functions shared by the mount commands for reading /etc/fstab.
+
+    parse_fstab fills the associative arrays MP_DEV, MP_FS, MP_OPTS and
+    MP_SUBVOL keyed by mount point (first entry wins, like 'head -n1'), and
+    MP_LIST with the mount points in fstab order. resolve_dev turns a
+    UUID=/LABEL=/PARTUUID= spec into its /dev/disk path.
+    """
+    return r"""
+    parse_fstab() {
+        declare -gA MP_DEV MP_FS MP_OPTS MP_SUBVOL
+        declare -ga MP_LIST=()
+        local mp dev fs opts sv
+        # One "mountpoint<TAB>device<TAB>fstype<TAB>options<TAB>subvol" line per entry
+        while IFS=$'\t' read -r mp dev fs opts sv; do
+            [ -n "${MP_DEV[$mp]+set}" ] && continue
+            MP_DEV[$mp]=$dev
+            MP_FS[$mp]=$fs
+            MP_OPTS[$mp]=$opts
+            MP_SUBVOL[$mp]=$sv
+            MP_LIST+=("$mp")
+        done < <(awk '$1 ~ /^#/ || NF < 3 {next} {
+            opts = $4; sv = ""
+            if (match(opts, /subvol=[^,]+/)) sv = substr(opts, RSTART + 7, RLENGTH - 7)
+            print $2 "\t" $1 "\t" $3 "\t" opts "\t" sv
+        }' "$1")
+    }
+    
+    # resolve_dev VAR SPEC - store the device node for an fstab device spec in VAR
+    resolve_dev() {
+        case "$2" in
+            UUID=*) printf -v "$1" '%s' "/dev/disk/by-uuid/${2#UUID=}" ;;
+            LABEL=*) printf -v "$1" '%s' "/dev/disk/by-label/${2#LABEL=}" ;;
+            PARTUUID=*) printf -v "$1" '%s' "/dev/disk/by-partuuid/${2#PARTUUID=}" ;;
+            *) printf -v "$1" '%s' "$2" ;;
+        esac
+    }
+    """
+
+
+def _build_mount_root_cmd():
+    """Generate a bash command to parse fstab and mount root device with Btrfs subvolume support."""
+    return _build_parse_fstab_function() + r"""
+    FSTAB_FILE="/etc/fstab"
+    if [ ! -f "$FSTAB_FILE" ]; then
+        echo "Error: /etc/fstab not found"
+        exit 1
+    fi
+    
+    parse_fstab "$FSTAB_FILE"
+    
+    # Root device is the entry for mount point "/"
+    ROOT_DEVICE="${MP_DEV[/]}"
+    FS_TYPE="${MP_FS[/]}"
+    MOUNT_OPTIONS="${MP_OPTS[/]}"
+    
+    if [ -z "$ROOT_DEVICE" ]; then
+        echo "Error: Could not find root device in /etc/fstab"
+        exit 1
+    fi
+    
+    echo "Found root device in fstab: $ROOT_DEVICE"
+    echo "Filesystem type: $FS_TYPE"
+    echo "Mount options: $MOUNT_OPTIONS"
+    
+    # Handle UUID, LABEL and PARTUUID
+    ORIGINAL_DEVICE="$ROOT_DEVICE"
+    resolve_dev ROOT_DEVICE "$ORIGINAL_DEVICE"
+    if [ "$ROOT_DEVICE" != "$ORIGINAL_DEVICE" ]; then
+        echo "Resolved $ORIGINAL_DEVICE to: $ROOT_DEVICE"
+    fi
+    UUID=""
+    [[ "$ORIGINAL_DEVICE" == UUID=* ]] && UUID="${ORIGINAL_DEVICE#UUID=}"
+    
+    # Wait for device to be available (up to 30 seconds for slow devices); udevadm
+    # returns as soon as the node shows up instead of polling once a second
+    if [ ! -e "$ROOT_DEVICE" ]; then
+        echo "Waiting for device $ROOT_DEVICE to become available..."
+        udevadm settle --timeout=30 --exit-if-exists="$ROOT_DEVICE" 2>/dev/null || true
+    fi
+    
+    if [ ! -e "$ROOT_DEVICE" ]; then
+        echo "Error: Device $ROOT_DEVICE does not exist after waiting"
+        
+        # Try to find the actual device by UUID if it was a UUID mount
+        if [ ! -z "$UUID" ]; then
+            echo "Attempting to find device by UUID using blkid..."
+            ACTUAL_DEVICE=$(blkid -U "$UUID" 2>/dev/null)
+            if [ ! -z "$ACTUAL_DEVICE" ] && [ -e "$ACTUAL_DEVICE" ]; then
+                echo "Found device via blkid: $ACTUAL_DEVICE"
+                ROOT_DEVICE="$ACTUAL_DEVICE"
+            else
+                echo "Could not find device with UUID: $UUID"
+                exit 1
+            fi
+        else
+            exit 1
+        fi
+    fi
+    
+    # Verify the device is a block device
+    if [ ! -b "$ROOT_DEVICE" ]; then
+        echo "Error: $ROOT_DEVICE is not a block device"
+        exit 1
+    fi
+    
+    # Create mount point if it doesn't exist
+    mkdir -p /tmp/linexin_installer/root
+    
+    # Special handling for different filesystem types
+    case "$FS_TYPE" in
+        btrfs)
+            echo "Detected Btrfs filesystem - handling subvolumes"
+            
+            # Subvolume was extracted from the mount options by the fstab parser
+            # Handle different formats: subvol=@, subvol=@root, subvolid=5, etc
+            SUBVOL="${MP_SUBVOL[/]}"
+            SUBVOLID=""
+            if [ -n "$SUBVOL" ]; then
+                echo "Found subvolume in fstab: '$SUBVOL'"
+            elif [[ "$MOUNT_OPTIONS" =~ subvolid=([^,]+) ]]; then
+                # Handle subvolume ID
+                SUBVOLID="${BASH_REMATCH[1]}"
+                echo "Found subvolume ID in fstab: $SUBVOLID"
+            fi
+            
+            # Mount with appropriate options
+            if [ ! -z "$SUBVOL" ] && [ "$SUBVOL" != "" ]; then
+                echo "Mounting Btrfs with subvolume: $SUBVOL"
+                mount -t btrfs -o subvol="$SUBVOL" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            elif [ ! -z "$SUBVOLID" ]; then
+                echo "Mounting Btrfs with subvolume ID: $SUBVOLID"
+                mount -t btrfs -o subvolid="$SUBVOLID" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            else
+                echo "Mounting Btrfs root (no subvolume specified)"
+                mount -t btrfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            fi
+            
+            MOUNT_RESULT=$?
+            
+            # If mount successful, mount other Btrfs subvolumes
+            if [ $MOUNT_RESULT -eq 0 ]; then
+                echo "Root mounted successfully, checking for other Btrfs subvolumes"
+                
+                # Walk all non-root Btrfs entries from the parsed fstab and mount
+                # them concurrently, one nesting depth per round so /var/log is
+                # only mounted once /var is in place
+                DEPTH=1
+                DEEPER=1
+                while [ $DEEPER -eq 1 ]; do
+                    DEEPER=0
+                    ROUND=()
+                    for MOUNT_POINT in "${MP_LIST[@]}"; do
+                        # Skip if not a Btrfs entry of the root device
+                        if [ "${MP_FS[$MOUNT_POINT]}" != "btrfs" ] || [ "$MOUNT_POINT" = "/" ] || \
+                           [ "${MP_DEV[$MOUNT_POINT]}" != "$ORIGINAL_DEVICE" ]; then
+                            continue
+                        fi
+                        SLASHES="${MOUNT_POINT//[^\/]/}"
+                        if [ ${#SLASHES} -gt $DEPTH ]; then
+                            DEEPER=1
+                            continue
+                        elif [ ${#SLASHES} -lt $DEPTH ]; then
+                            continue
+                        fi
+                        if [ -n "${MP_SUBVOL[$MOUNT_POINT]}" ]; then
+                            echo "Found $MOUNT_POINT subvolume: ${MP_SUBVOL[$MOUNT_POINT]}"
+                            ROUND+=("$MOUNT_POINT")
+                        fi
+                    done
+                    
+                    if [ ${#ROUND[@]} -gt 0 ]; then
+                        # Create this round's mount points with a single mkdir
+                        mkdir -p "${ROUND[@]/#//tmp/linexin_installer/root}"
+                        for MOUNT_POINT in "${ROUND[@]}"; do
+                            (
+                                if mount -t btrfs -o subvol="${MP_SUBVOL[$MOUNT_POINT]}" "$ROOT_DEVICE" "/tmp/linexin_installer/root$MOUNT_POINT"; then
+                                    echo "Successfully mounted $MOUNT_POINT subvolume"
+                                else
+                                    echo "Warning: Failed to mount $MOUNT_POINT subvolume"
+                                fi
+                            ) &
+                        done
+                        wait
+                    fi
+                    DEPTH=$((DEPTH + 1))
+                done
+            fi
+            ;;
+            
+        ext2|ext3|ext4)
+            echo "Mounting ext filesystem"
+            mount -t "$FS_TYPE" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+            
+        xfs)
+            echo "Mounting XFS filesystem"
+            mount -t xfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+            
+        f2fs)
+            echo "Mounting F2FS filesystem"
+            mount -t f2fs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+            
+        jfs)
+            echo "Mounting JFS filesystem"
+            mount -t jfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+            
+        reiserfs)
+            echo "Mounting ReiserFS filesystem"
+            mount -t reiserfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+            
+        ntfs|ntfs-3g)
+            echo "Mounting NTFS filesystem"
+            # Try ntfs3 driver first (kernel driver), fallback to ntfs-3g (FUSE)
+            mount -t ntfs3 "$ROOT_DEVICE" "/tmp/linexin_installer/root" 2>/dev/null
+            if [ $? -ne 0 ]; then
+                echo "ntfs3 driver failed, trying ntfs-3g..."
+                mount -t ntfs-3g "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            fi
+            MOUNT_RESULT=$?
+            ;;
+            
+        vfat|msdos)
+            echo "Mounting FAT filesystem"
+            mount -t "$FS_TYPE" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+            
+        *)
+            echo "Filesystem type: $FS_TYPE - attempting auto-detect mount"
+            mount "$ROOT_DEVICE" "/tmp/linexin_installer/root"
+            MOUNT_RESULT=$?
+            ;;
+    esac
     
+    # Check if mount was successful
+    if [ $MOUNT_RESULT -eq 0 ]; then
+        echo "Successfully mounted root filesystem"
+        
+        # Verify mount
+        if grep -q " /tmp/linexin_installer/root " /proc/self/mounts; then
+            echo "Mount point verification successful"
+            
+            # Display mount information
+            df -h /tmp/linexin_installer/root
+            
+            # Show all mounted filesystems related to our mount point
+            echo "All mounted filesystems:"
+            grep " /tmp/linexin_installer/root" /proc/self/mounts || true
+            
+            # For Btrfs, show subvolume information
+            if [ "$FS_TYPE" = "btrfs" ]; then
+                echo "Btrfs subvolume information:"
+                if command -v btrfs >/dev/null 2>&1; then
+                    btrfs subvolume list /tmp/linexin_installer/root 2>/dev/null || true
+                fi
+            fi
+        else
+            echo "Warning: Mount succeeded but mount point verification failed"
+        fi
+    else
+        echo "Error: Failed to mount root filesystem (exit code: $MOUNT_RESULT)"
+        
+        # Provide helpful debugging information
+        echo "Debugging information:"
+        echo "Device: $ROOT_DEVICE"
+        echo "Filesystem: $FS_TYPE"
+        echo "Options: $MOUNT_OPTIONS"
+        
+        # Check if device exists and is accessible
+        if [ -e "$ROOT_DEVICE" ]; then
+            echo "Device exists"
+            ls -la "$ROOT_DEVICE"
+            
+            # Try to get filesystem info
+            file -s "$ROOT_DEVICE" 2>/dev/null || true
+            blkid "$ROOT_DEVICE" 2>/dev/null || true
+        else
+            echo "Device does not exist!"
+        fi
+        
+        exit 1
+    fi
+    """
+
+
+def _build_mount_boot_cmd():
+    """Generate a bash command to parse fstab and mount boot device with better error handling."""
+    return _build_parse_fstab_function() + r"""
+    FSTAB_FILE="/etc/fstab"
+    if [ ! -f "$FSTAB_FILE" ]; then
+        echo "Warning: /etc/fstab not found, skipping boot partition"
+        exit 0
+    fi
+    
+    parse_fstab "$FSTAB_FILE"
+    
+    # Boot device is the entry for mount point "/boot"
+    if [ -z "${MP_DEV[/boot]}" ]; then
+        echo "No separate /boot partition found in /etc/fstab (boot might be on root partition)"
+        
+        # Check if /boot exists as a Btrfs subvolume
+        if [ "${MP_FS[/]}" = "btrfs" ]; then
+            echo "Root is Btrfs, checking for @boot subvolume in fstab"
+            if [ "${MP_FS[/boot]}" = "btrfs" ]; then
+                echo "Found /boot as Btrfs subvolume, will be mounted with root"
+            fi
+        fi
+        exit 0
+    fi
+    
+    BOOT_DEVICE="${MP_DEV[/boot]}"
+    FS_TYPE="${MP_FS[/boot]}"
+    MOUNT_OPTIONS="${MP_OPTS[/boot]}"
+    
+    echo "Found boot device in fstab: $BOOT_DEVICE"
+    echo "Boot filesystem type: $FS_TYPE"
+    echo "Boot mount options: $MOUNT_OPTIONS"
+    
+    # Handle UUID, LABEL and PARTUUID
+    ORIGINAL_DEVICE="$BOOT_DEVICE"
+    resolve_dev BOOT_DEVICE "$ORIGINAL_DEVICE"
+    if [ "$BOOT_DEVICE" != "$ORIGINAL_DEVICE" ]; then
+        echo "Resolved $ORIGINAL_DEVICE to: $BOOT_DEVICE"
+    fi
+    UUID=""
+    [[ "$ORIGINAL_DEVICE" == UUID=* ]] && UUID="${ORIGINAL_DEVICE#UUID=}"
+    
+    # For Btrfs subvolumes, the device might be the same as root
+    if [ "$FS_TYPE" = "btrfs" ]; then
+        echo "Boot is on Btrfs filesystem"
+        
+        # Check if it's a subvolume (already extracted by parse_fstab)
+        BOOT_SUBVOL="${MP_SUBVOL[/boot]}"
+        if [ -n "$BOOT_SUBVOL" ]; then
+            echo "Boot is a Btrfs subvolume: $BOOT_SUBVOL"
+            
+            # Get the root device to mount from
+            ROOT_DEVICE_LINE="${MP_DEV[/]}"
+            resolve_dev ROOT_DEVICE "$ROOT_DEVICE_LINE"
+            
+            # Use root device for mounting boot subvolume
+            if [ "$ORIGINAL_DEVICE" = "$ROOT_DEVICE_LINE" ] || [ "$BOOT_DEVICE" = "$ROOT_DEVICE" ]; then
+                echo "Boot subvolume is on the same device as root"
+                BOOT_DEVICE="$ROOT_DEVICE"
+            fi
+        fi
+    fi
+    
+    # Wait for device to be available (up to 30 seconds); udevadm
+    # returns as soon as the node shows up instead of polling once a second
+    if [ ! -e "$BOOT_DEVICE" ]; then
+        echo "Waiting for device $BOOT_DEVICE to become available..."
+        udevadm settle --timeout=30 --exit-if-exists="$BOOT_DEVICE" 2>/dev/null || true
+    fi
+    
+    if [ ! -e "$BOOT_DEVICE" ]; then
+        echo "Device $BOOT_DEVICE does not exist after waiting"
+        
+        # Try to find the actual device by UUID if it was a UUID mount
+        if [ ! -z "$UUID" ]; then
+            echo "Attempting to find device by UUID using blkid..."
+            ACTUAL_DEVICE=$(blkid -U "$UUID" 2>/dev/null)
+            if [ ! -z "$ACTUAL_DEVICE" ] && [ -e "$ACTUAL_DEVICE" ]; then
+                echo "Found device via blkid: $ACTUAL_DEVICE"
+                BOOT_DEVICE="$ACTUAL_DEVICE"
+            else
+                echo "Warning: Could not find boot device with UUID: $UUID"
+                echo "Boot partition mount skipped - may be on root partition"
+                exit 0
+            fi
+        else
+            echo "Warning: Boot device not found, skipping"
+            exit 0
+        fi
+    fi
+    
+    # Verify the device is a block device
+    if [ ! -b "$BOOT_DEVICE" ]; then
+        echo "Warning: $BOOT_DEVICE is not a block device, skipping boot mount"
+        exit 0
+    fi
+    
+    # Create mount point
+    mkdir -p /tmp/linexin_installer/root/boot
+    
+    # Mount the boot partition based on filesystem type
+    echo "Mounting boot device: $BOOT_DEVICE"
+    
+    case "$FS_TYPE" in
+        btrfs)
+            if [ ! -z "$BOOT_SUBVOL" ] && [ "$BOOT_SUBVOL" != "" ]; then
+                # Mount Btrfs subvolume
+                echo "Mounting Btrfs boot subvolume: $BOOT_SUBVOL"
+                mount -t btrfs -o subvol="$BOOT_SUBVOL" "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            else
+                echo "Mounting Btrfs boot (no subvolume)"
+                mount -t btrfs "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            fi
+            ;;
+            
+        ext2|ext3|ext4)
+            echo "Mounting ext boot filesystem"
+            mount -t "$FS_TYPE" "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            ;;
+            
+        xfs)
+            echo "Mounting XFS boot filesystem"
+            mount -t xfs "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            ;;
+            
+        vfat|msdos)
+            echo "Mounting FAT boot filesystem (EFI)"
+            mount -t "$FS_TYPE" "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            ;;
+            
+        ntfs|ntfs-3g)
+            echo "Mounting NTFS boot filesystem"
+            mount -t ntfs3 "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot" 2>/dev/null || \
+            mount -t ntfs-3g "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            ;;
+            
+        *)
+            echo "Filesystem type: $FS_TYPE - attempting auto-detect mount"
+            mount "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
+            ;;
+    esac
+    
+    # Check if mount was successful
+    if [ $? -eq 0 ]; then
+        echo "Successfully mounted boot partition"
+        if grep -q " /tmp/linexin_installer/root/boot " /proc/self/mounts; then
+            echo "Boot mount point verification successful"
+            df -h /tmp/linexin_installer/root/boot
+            
+            # Check for EFI files
+            if [ -d "/tmp/linexin_installer/root/boot/EFI" ]; then
+                echo "EFI directory found - this is an EFI boot partition"
+            elif [ -d "/tmp/linexin_installer/root/boot/grub" ] || [ -d "/tmp/linexin_installer/root/boot/grub2" ]; then
+                echo "GRUB directory found - this is a BIOS/Legacy boot partition"
+            fi
+        fi
+    else
+        echo "Warning: Failed to mount boot partition"
+        echo "This may not be critical if boot is part of the root partition"
+        
+        # Check if /boot exists on root
+        if [ -d "/tmp/linexin_installer/root/boot" ]; then
+            echo "Boot directory exists on root partition"
+            ls -la /tmp/linexin_installer/root/boot/ 2>/dev/null | head -5
+        fi
+        
+        exit 0
+    fi
+    """
+
+
 class InstallationWidget(Gtk.Box):
     """
     A GTK widget for displaying installation progress with detailed logging.
@@ -46,6 +617,10 @@ class InstallationWidget(Gtk.Box):
         'installation-cancelled': (GObject.SignalFlags.RUN_FIRST, None, ()),
     }
 
+    # The mount scripts take no runtime inputs, so build them once at import
+    _MOUNT_ROOT_CMD = _build_mount_root_cmd()
+    _MOUNT_BOOT_CMD = _build_mount_boot_cmd()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.set_orientation(Gtk.Orientation.VERTICAL)
@@ -58,12 +633,32 @@ class InstallationWidget(Gtk.Box):
         self.state = InstallationState.IDLE
         self.current_step = 0
         self.installation_steps: List[InstallationStep] = []
+        # Filled by start_installation so step changes only set text
+        self._total_weight = 1.0
+        self._step_texts: List[Tuple[str, str, str]] = []
+        self._elapsed_text = "Elapsed time"
         self.installation_thread = None
+        self._shell = None
+        self._shell_output = None
         self.should_cancel = False
         self.show_details = False
-        self.log_buffer = []
-        self.output_queue = queue.Queue()
+        self.log_buffer = deque(maxlen=MAX_LOG_LINES)
+        # Terminal output waiting for the next main-loop flush
+        self._pending_log = deque()
+        # Tagged output kept for the terminal until it is first shown
+        self._unshown_log = deque(maxlen=MAX_TERMINAL_LINES)
+        self._log_flush_scheduled = False
         self.start_time = None
+        self._start_frame_time = None
+        self._last_sec = -1
+        # Latest step/progress from the worker, applied on the next frame
+        self._pending_step = None
+        self._pending_progress = None
+        self.target_progress = 0.0
+        self._progress_animating = False
+        self._scroll_pending = False
+        # Frame-clock tick, only installed while there is something to update
+        self._tick_id = 0
         
         # Callbacks
         self.on_complete_callback: Optional[Callable] = None
@@ -77,58 +672,17 @@ class InstallationWidget(Gtk.Box):
 
     def setup_css(self):
         """Setup CSS styling for buttons"""
+        global _CSS_INSTALLED
+        if _CSS_INSTALLED:
+            return
         css_provider = Gtk.CssProvider()
-        css_data = """
-        .back_button {
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
-        }
-        
-        .back_button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px alpha(@theme_bg_color, 0.3);
-        }
-        
-        .back_button:active {
-            transform: translateY(0px);
-        }
-
-        .continue_button {
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
-        }
-        
-        .continue_button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px alpha(@accent_color, 0.3);
-        }
-        
-        .continue_button:active {
-            transform: translateY(0px);
-        }
-        
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-        
-        .pulse-animation {
-            animation: pulse 2s ease-in-out infinite;
-        }
-        """
-        css_provider.load_from_data(css_data.encode())
+        css_provider.load_from_data(_CSS_DATA)
         Gtk.StyleContext.add_provider_for_display(
             Gdk.Display.get_default(),
             css_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
+        _CSS_INSTALLED = True
 
     
     def _build_ui(self):
@@ -152,7 +706,7 @@ class InstallationWidget(Gtk.Box):
         main_box.append(header_box)
         
         # Large Status Icon
-        self.status_icon = Gtk.Image.new_from_icon_name("system-run-symbolic")
+        self.status_icon = Gtk.Image.new_from_gicon(_STATUS_ICON_GICON)
         self.status_icon.set_pixel_size(64)
         self.status_icon.add_css_class('accent')
         self.status_icon.set_halign(Gtk.Align.CENTER)
@@ -222,10 +776,7 @@ class InstallationWidget(Gtk.Box):
         self.toggle_details_btn.connect("clicked", self._on_toggle_details)
         
         # Add hover effects
-        details_hover = Gtk.EventControllerMotion()
-        details_hover.connect("enter", lambda c, x, y: self.toggle_details_btn.add_css_class("pulse-animation"))
-        details_hover.connect("leave", lambda c: self.toggle_details_btn.remove_css_class("pulse-animation"))
-        self.toggle_details_btn.add_controller(details_hover)
+        self._attach_pulse(self.toggle_details_btn)
         
         details_box.append(self.toggle_details_btn)
         
@@ -233,35 +784,11 @@ class InstallationWidget(Gtk.Box):
         self.details_revealer.set_transition_type(Gtk.RevealerTransitionType.SLIDE_DOWN)
         details_box.append(self.details_revealer)
         
-        terminal_frame = Gtk.Frame()
-        terminal_frame.add_css_class('view') # Adwaita view style
-        self.details_revealer.set_child(terminal_frame)
-        
-        self.scrolled_window = Gtk.ScrolledWindow()
-        self.scrolled_window.set_min_content_height(150)
-        self.scrolled_window.set_max_content_height(300)
-        self.scrolled_window.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-        terminal_frame.set_child(self.scrolled_window)
-        
-        self.terminal_view = Gtk.TextView()
-        self.terminal_view.set_editable(False)
-        self.terminal_view.set_monospace(True)
-        self.terminal_view.set_wrap_mode(Gtk.WrapMode.CHAR)
-        self.terminal_view.set_left_margin(12)
-        self.terminal_view.set_right_margin(12)
-        self.terminal_view.set_top_margin(12)
-        self.terminal_view.set_bottom_margin(12)
-        
-        self.terminal_buffer = self.terminal_view.get_buffer()
-        self.terminal_view.add_css_class('console') # Custom or adwaita class
-        
-        # Create tags
-        self.terminal_buffer.create_tag("command", weight=Pango.Weight.BOLD, foreground="#62a0ea") # Blue
-        self.terminal_buffer.create_tag("success", foreground="#57e389") # Green
-        self.terminal_buffer.create_tag("error", foreground="#ff7b63") # Red
-        self.terminal_buffer.create_tag("info", foreground="#f6d32d") # Yellow
-        
-        self.scrolled_window.set_child(self.terminal_view)
+        # The terminal itself is built on first expansion (_build_terminal)
+        self.terminal_frame = None
+        self.scrolled_window = None
+        self.terminal_view = None
+        self.terminal_buffer = None
         
         # --- Action Buttons ---
         button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
@@ -280,10 +807,7 @@ class InstallationWidget(Gtk.Box):
         self.btn_cancel.connect("clicked", self._on_cancel_clicked)
         
         # Add hover effects to cancel button
-        cancel_hover = Gtk.EventControllerMotion()
-        cancel_hover.connect("enter", lambda c, x, y: self.btn_cancel.add_css_class("pulse-animation"))
-        cancel_hover.connect("leave", lambda c: self.btn_cancel.remove_css_class("pulse-animation"))
-        self.btn_cancel.add_controller(cancel_hover)
+        self._attach_pulse(self.btn_cancel)
         
         button_box.append(self.btn_cancel)
         
@@ -295,474 +819,79 @@ class InstallationWidget(Gtk.Box):
         self.btn_continue.connect("clicked", self._on_continue_clicked)
 
         # Add hover effects to continue button
-        continue_hover = Gtk.EventControllerMotion()
-        continue_hover.connect("enter", lambda c, x, y: self.btn_continue.add_css_class("pulse-animation"))
-        continue_hover.connect("leave", lambda c: self.btn_continue.remove_css_class("pulse-animation"))
-        self.btn_continue.add_controller(continue_hover)
+        self._attach_pulse(self.btn_continue)
 
         button_box.append(self.btn_continue)
-        
-        # Start timer update
-        GLib.timeout_add(1000, self._update_timer)
 
     
-    def _get_mount_root_command(self):
-        """Generate a bash command to parse fstab and mount root device with Btrfs subvolume support."""
-        return r"""
-        FSTAB_FILE="/etc/fstab"
-        if [ ! -f "$FSTAB_FILE" ]; then
-            echo "Error: /etc/fstab not found"
-            exit 1
-        fi
-        
-        # Parse fstab for root device (looking for mount point "/")
-        ROOT_LINE=$(awk '$2 == "/" && $1 !~ /^#/ {print $0}' "$FSTAB_FILE" | head -n1)
-        ROOT_DEVICE=$(echo "$ROOT_LINE" | awk '{print $1}')
-        FS_TYPE=$(echo "$ROOT_LINE" | awk '{print $3}')
-        MOUNT_OPTIONS=$(echo "$ROOT_LINE" | awk '{print $4}')
-        
-        if [ -z "$ROOT_DEVICE" ]; then
-            echo "Error: Could not find root device in /etc/fstab"
-            exit 1
-        fi
-        
-        echo "Found root device in fstab: $ROOT_DEVICE"
-        echo "Filesystem type: $FS_TYPE"
-        echo "Mount options: $MOUNT_OPTIONS"
-        
-        # Handle UUID and LABEL
-        ORIGINAL_DEVICE="$ROOT_DEVICE"
-        if [[ "$ROOT_DEVICE" == UUID=* ]]; then
-            UUID="${ROOT_DEVICE#UUID=}"
-            ROOT_DEVICE="/dev/disk/by-uuid/$UUID"
-            echo "Resolved UUID to: $ROOT_DEVICE"
-        elif [[ "$ROOT_DEVICE" == LABEL=* ]]; then
-            LABEL="${ROOT_DEVICE#LABEL=}"
-            ROOT_DEVICE="/dev/disk/by-label/$LABEL"
-            echo "Resolved LABEL to: $LABEL"
-        elif [[ "$ROOT_DEVICE" == PARTUUID=* ]]; then
-            PARTUUID="${ROOT_DEVICE#PARTUUID=}"
-            ROOT_DEVICE="/dev/disk/by-partuuid/$PARTUUID"
-            echo "Resolved PARTUUID to: $ROOT_DEVICE"
-        fi
-        
-        # Wait for device to be available (up to 30 seconds for slow devices)
-        WAIT_COUNT=0
-        while [ ! -e "$ROOT_DEVICE" ] && [ $WAIT_COUNT -lt 30 ]; do
-            echo "Waiting for device $ROOT_DEVICE to become available..."
-            sleep 1
-            WAIT_COUNT=$((WAIT_COUNT + 1))
-        done
-        
-        if [ ! -e "$ROOT_DEVICE" ]; then
-            echo "Error: Device $ROOT_DEVICE does not exist after waiting"
-            
-            # Try to find the actual device by UUID if it was a UUID mount
-            if [ ! -z "$UUID" ]; then
-                echo "Attempting to find device by UUID using blkid..."
-                ACTUAL_DEVICE=$(blkid -U "$UUID" 2>/dev/null)
-                if [ ! -z "$ACTUAL_DEVICE" ] && [ -e "$ACTUAL_DEVICE" ]; then
-                    echo "Found device via blkid: $ACTUAL_DEVICE"
-                    ROOT_DEVICE="$ACTUAL_DEVICE"
-                else
-                    echo "Could not find device with UUID: $UUID"
-                    exit 1
-                fi
-            else
-                exit 1
-            fi
-        fi
-        
-        # Verify the device is a block device
-        if [ ! -b "$ROOT_DEVICE" ]; then
-            echo "Error: $ROOT_DEVICE is not a block device"
-            exit 1
-        fi
-        
-        # Create mount point if it doesn't exist
-        mkdir -p /tmp/linexin_installer/root
-        
-        # Special handling for different filesystem types
-        case "$FS_TYPE" in
-            btrfs)
-                echo "Detected Btrfs filesystem - handling subvolumes"
-                
-                # Extract subvolume from mount options
-                # Handle different formats: subvol=@, subvol=@root, subvolid=5, etc
-                SUBVOL=""
-                if echo "$MOUNT_OPTIONS" | grep -q "subvol="; then
-                    # Extract subvolume name - handle both subvol=@ and subvol=@,other_options
-                    SUBVOL=$(echo "$MOUNT_OPTIONS" | sed -E 's/.*subvol=([^,]+).*/\1/')
-                    echo "Found subvolume in fstab: '$SUBVOL'"
-                    
-                    # Validate that we actually got a subvolume
-                    if [ -z "$SUBVOL" ]; then
-                        echo "Warning: Empty subvolume name extracted, trying alternative parsing"
-                        # Try alternative parsing for edge cases
-                        SUBVOL=$(echo "$MOUNT_OPTIONS" | grep -o 'subvol=[^,]*' | cut -d= -f2)
-                        echo "Alternative parsing result: '$SUBVOL'"
-                    fi
-                elif echo "$MOUNT_OPTIONS" | grep -q "subvolid="; then
-                    # Handle subvolume ID
-                    SUBVOLID=$(echo "$MOUNT_OPTIONS" | sed -E 's/.*subvolid=([^,]+).*/\1/')
-                    echo "Found subvolume ID in fstab: $SUBVOLID"
-                fi
-                
-                # Mount with appropriate options
-                if [ ! -z "$SUBVOL" ] && [ "$SUBVOL" != "" ]; then
-                    echo "Mounting Btrfs with subvolume: $SUBVOL"
-                    mount -t btrfs -o subvol="$SUBVOL" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                elif [ ! -z "$SUBVOLID" ]; then
-                    echo "Mounting Btrfs with subvolume ID: $SUBVOLID"
-                    mount -t btrfs -o subvolid="$SUBVOLID" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                else
-                    echo "Mounting Btrfs root (no subvolume specified)"
-                    mount -t btrfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                fi
-                
-                MOUNT_RESULT=$?
-                
-                # If mount successful, mount other Btrfs subvolumes
-                if [ $MOUNT_RESULT -eq 0 ]; then
-                    echo "Root mounted successfully, checking for other Btrfs subvolumes"
-                    
-                    # Parse all non-root Btrfs entries from fstab
-                    while IFS= read -r line; do
-                        [ -z "$line" ] && continue
-                        
-                        MOUNT_POINT=$(echo "$line" | awk '{print $2}')
-                        SUBVOL_DEVICE=$(echo "$line" | awk '{print $1}')
-                        SUBVOL_OPTIONS=$(echo "$line" | awk '{print $4}')
-                        
-                        # Skip if device doesn't match root device
-                        if [ "$SUBVOL_DEVICE" != "$ORIGINAL_DEVICE" ]; then
-                            continue
-                        fi
-                        
-                        # Extract subvolume name
-                        SUBVOL_NAME=""
-                        if echo "$SUBVOL_OPTIONS" | grep -q "subvol="; then
-                            SUBVOL_NAME=$(echo "$SUBVOL_OPTIONS" | sed -E 's/.*subvol=([^,]+).*/\1/')
-                        fi
-                        
-                        if [ ! -z "$SUBVOL_NAME" ] && [ "$SUBVOL_NAME" != "" ]; then
-                            echo "Found $MOUNT_POINT subvolume: $SUBVOL_NAME"
-                            mkdir -p "/tmp/linexin_installer/root$MOUNT_POINT"
-                            mount -t btrfs -o subvol="$SUBVOL_NAME" "$ROOT_DEVICE" "/tmp/linexin_installer/root$MOUNT_POINT"
-                            if [ $? -eq 0 ]; then
-                                echo "Successfully mounted $MOUNT_POINT subvolume"
-                            else
-                                echo "Warning: Failed to mount $MOUNT_POINT subvolume"
-                            fi
-                        fi
-                    done < <(awk '$1 !~ /^#/ && $3 == "btrfs" && $2 != "/" {print $0}' "$FSTAB_FILE")
-                fi
-                ;;
-                
-            ext2|ext3|ext4)
-                echo "Mounting ext filesystem"
-                mount -t "$FS_TYPE" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-                
-            xfs)
-                echo "Mounting XFS filesystem"
-                mount -t xfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-                
-            f2fs)
-                echo "Mounting F2FS filesystem"
-                mount -t f2fs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-                
-            jfs)
-                echo "Mounting JFS filesystem"
-                mount -t jfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-                
-            reiserfs)
-                echo "Mounting ReiserFS filesystem"
-                mount -t reiserfs "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-                
-            ntfs|ntfs-3g)
-                echo "Mounting NTFS filesystem"
-                # Try ntfs3 driver first (kernel driver), fallback to ntfs-3g (FUSE)
-                mount -t ntfs3 "$ROOT_DEVICE" "/tmp/linexin_installer/root" 2>/dev/null
-                if [ $? -ne 0 ]; then
-                    echo "ntfs3 driver failed, trying ntfs-3g..."
-                    mount -t ntfs-3g "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                fi
-                MOUNT_RESULT=$?
-                ;;
-                
-            vfat|msdos)
-                echo "Mounting FAT filesystem"
-                mount -t "$FS_TYPE" "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-                
-            *)
-                echo "Filesystem type: $FS_TYPE - attempting auto-detect mount"
-                mount "$ROOT_DEVICE" "/tmp/linexin_installer/root"
-                MOUNT_RESULT=$?
-                ;;
-        esac
-        
-        # Check if mount was successful
-        if [ $MOUNT_RESULT -eq 0 ]; then
-            echo "Successfully mounted root filesystem"
-            
-            # Verify mount
-            if mountpoint -q /tmp/linexin_installer/root; then
-                echo "Mount point verification successful"
-                
-                # Display mount information
-                df -h /tmp/linexin_installer/root
-                
-                # Show all mounted filesystems related to our mount point
-                echo "All mounted filesystems:"
-                mount | grep "/tmp/linexin_installer/root"
-                
-                # For Btrfs, show subvolume information
-                if [ "$FS_TYPE" = "btrfs" ]; then
-                    echo "Btrfs subvolume information:"
-                    if command -v btrfs >/dev/null 2>&1; then
-                        btrfs subvolume list /tmp/linexin_installer/root 2>/dev/null || true
-                    fi
-                fi
-            else
-                echo "Warning: Mount succeeded but mount point verification failed"
-            fi
-        else
-            echo "Error: Failed to mount root filesystem (exit code: $MOUNT_RESULT)"
-            
-            # Provide helpful debugging information
-            echo "Debugging information:"
-            echo "Device: $ROOT_DEVICE"
-            echo "Filesystem: $FS_TYPE"
-            echo "Options: $MOUNT_OPTIONS"
-            
-            # Check if device exists and is accessible
-            if [ -e "$ROOT_DEVICE" ]; then
-                echo "Device exists"
-                ls -la "$ROOT_DEVICE"
-                
-                # Try to get filesystem info
-                file -s "$ROOT_DEVICE" 2>/dev/null || true
-                blkid "$ROOT_DEVICE" 2>/dev/null || true
-            else
-                echo "Device does not exist!"
-            fi
-            
-            exit 1
-        fi
-        """
-    
-    def _get_mount_boot_command(self):
-        """Generate a bash command to parse fstab and mount boot device with better error handling."""
-        return r"""
-        FSTAB_FILE="/etc/fstab"
-        if [ ! -f "$FSTAB_FILE" ]; then
-            echo "Warning: /etc/fstab not found, skipping boot partition"
-            exit 0
-        fi
-        
-        # Parse fstab for boot device (looking for mount point "/boot")
-        BOOT_LINE=$(awk '$2 == "/boot" && $1 !~ /^#/ {print $0}' "$FSTAB_FILE" | head -n1)
-        
-        if [ -z "$BOOT_LINE" ]; then
-            echo "No separate /boot partition found in /etc/fstab (boot might be on root partition)"
-            
-            # Check if /boot exists as a Btrfs subvolume
-            ROOT_FS_TYPE=$(awk '$2 == "/" && $1 !~ /^#/ {print $3}' "$FSTAB_FILE" | head -n1)
-            if [ "$ROOT_FS_TYPE" = "btrfs" ]; then
-                echo "Root is Btrfs, checking for @boot subvolume in fstab"
-                BOOT_SUBVOL_LINE=$(awk '$2 == "/boot" && $3 == "btrfs" && $1 !~ /^#/ {print $0}' "$FSTAB_FILE" | head -n1)
-                if [ ! -z "$BOOT_SUBVOL_LINE" ]; then
-                    echo "Found /boot as Btrfs subvolume, will be mounted with root"
-                fi
-            fi
-            exit 0
-        fi
+    def _build_terminal(self):
+        """Build the log view on first expansion and fill it with the log so far."""
+        self.terminal_frame = Gtk.Frame()
+        self.terminal_frame.add_css_class('view') # Adwaita view style
         
-        BOOT_DEVICE=$(echo "$BOOT_LINE" | awk '{print $1}')
-        FS_TYPE=$(echo "$BOOT_LINE" | awk '{print $3}')
-        MOUNT_OPTIONS=$(echo "$BOOT_LINE" | awk '{print $4}')
-        
-        echo "Found boot device in fstab: $BOOT_DEVICE"
-        echo "Boot filesystem type: $FS_TYPE"
-        echo "Boot mount options: $MOUNT_OPTIONS"
-        
-        # Handle UUID and LABEL
-        ORIGINAL_DEVICE="$BOOT_DEVICE"
-        if [[ "$BOOT_DEVICE" == UUID=* ]]; then
-            UUID="${BOOT_DEVICE#UUID=}"
-            BOOT_DEVICE="/dev/disk/by-uuid/$UUID"
-            echo "Resolved UUID to: $BOOT_DEVICE"
-        elif [[ "$BOOT_DEVICE" == LABEL=* ]]; then
-            LABEL="${BOOT_DEVICE#LABEL=}"
-            BOOT_DEVICE="/dev/disk/by-label/$LABEL"
-            echo "Resolved LABEL to: $BOOT_DEVICE"
-        elif [[ "$BOOT_DEVICE" == PARTUUID=* ]]; then
-            PARTUUID="${BOOT_DEVICE#PARTUUID=}"
-            BOOT_DEVICE="/dev/disk/by-partuuid/$PARTUUID"
-            echo "Resolved PARTUUID to: $BOOT_DEVICE"
-        fi
+        self.scrolled_window = Gtk.ScrolledWindow()
+        self.scrolled_window.set_min_content_height(150)
+        self.scrolled_window.set_max_content_height(300)
+        self.scrolled_window.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        self.terminal_frame.set_child(self.scrolled_window)
         
-        # For Btrfs subvolumes, the device might be the same as root
-        if [ "$FS_TYPE" = "btrfs" ]; then
-            echo "Boot is on Btrfs filesystem"
-            
-            # Check if it's a subvolume - properly extract it
-            if echo "$MOUNT_OPTIONS" | grep -q "subvol="; then
-                # Use the same fixed extraction as in mount_root
-                BOOT_SUBVOL=$(echo "$MOUNT_OPTIONS" | sed -E 's/.*subvol=([^,]+).*/\1/')
-                echo "Boot is a Btrfs subvolume: $BOOT_SUBVOL"
-                
-                # Validate extraction
-                if [ -z "$BOOT_SUBVOL" ]; then
-                    echo "Warning: Empty subvolume name extracted, trying alternative parsing"
-                    BOOT_SUBVOL=$(echo "$MOUNT_OPTIONS" | grep -o 'subvol=[^,]*' | cut -d= -f2)
-                    echo "Alternative parsing result: '$BOOT_SUBVOL'"
-                fi
-                
-                # Get the root device to mount from
-                ROOT_DEVICE_LINE=$(awk '$2 == "/" && $1 !~ /^#/ {print $1}' "$FSTAB_FILE" | head -n1)
-                if [[ "$ROOT_DEVICE_LINE" == UUID=* ]]; then
-                    ROOT_UUID="${ROOT_DEVICE_LINE#UUID=}"
-                    ROOT_DEVICE="/dev/disk/by-uuid/$ROOT_UUID"
-                elif [[ "$ROOT_DEVICE_LINE" == LABEL=* ]]; then
-                    ROOT_LABEL="${ROOT_DEVICE_LINE#LABEL=}"
-                    ROOT_DEVICE="/dev/disk/by-label/$ROOT_LABEL"
-                elif [[ "$ROOT_DEVICE_LINE" == PARTUUID=* ]]; then
-                    ROOT_PARTUUID="${ROOT_DEVICE_LINE#PARTUUID=}"
-                    ROOT_DEVICE="/dev/disk/by-partuuid/$ROOT_PARTUUID"
-                else
-                    ROOT_DEVICE="$ROOT_DEVICE_LINE"
-                fi
-                
-                # Use root device for mounting boot subvolume
-                if [ "$ORIGINAL_DEVICE" = "$ROOT_DEVICE_LINE" ] || [ "$BOOT_DEVICE" = "$ROOT_DEVICE" ]; then
-                    echo "Boot subvolume is on the same device as root"
-                    BOOT_DEVICE="$ROOT_DEVICE"
-                fi
-            fi
-        fi
+        self.terminal_view = Gtk.TextView()
+        self.terminal_view.set_editable(False)
+        self.terminal_view.set_monospace(True)
+        # WORD_CHAR lays out far cheaper than CHAR for shell output, and a
+        # hidden cursor stops the blink timer redrawing the view
+        self.terminal_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        self.terminal_view.set_cursor_visible(False)
+        self.terminal_view.set_left_margin(12)
+        self.terminal_view.set_right_margin(12)
+        self.terminal_view.set_top_margin(12)
+        self.terminal_view.set_bottom_margin(12)
         
-        # Wait for device to be available (up to 30 seconds)
-        WAIT_COUNT=0
-        while [ ! -e "$BOOT_DEVICE" ] && [ $WAIT_COUNT -lt 30 ]; do
-            echo "Waiting for device $BOOT_DEVICE to become available..."
-            sleep 1
-            WAIT_COUNT=$((WAIT_COUNT + 1))
-        done
+        self.terminal_buffer = self.terminal_view.get_buffer()
+        # The log is never edited, so don't record every insert and trim
+        # in the buffer's undo history
+        self.terminal_buffer.set_enable_undo(False)
+        self.terminal_view.add_css_class('console') # Custom or adwaita class
         
-        if [ ! -e "$BOOT_DEVICE" ]; then
-            echo "Device $BOOT_DEVICE does not exist after waiting"
-            
-            # Try to find the actual device by UUID if it was a UUID mount
-            if [ ! -z "$UUID" ]; then
-                echo "Attempting to find device by UUID using blkid..."
-                ACTUAL_DEVICE=$(blkid -U "$UUID" 2>/dev/null)
-                if [ ! -z "$ACTUAL_DEVICE" ] && [ -e "$ACTUAL_DEVICE" ]; then
-                    echo "Found device via blkid: $ACTUAL_DEVICE"
-                    BOOT_DEVICE="$ACTUAL_DEVICE"
-                else
-                    echo "Warning: Could not find boot device with UUID: $UUID"
-                    echo "Boot partition mount skipped - may be on root partition"
-                    exit 0
-                fi
-            else
-                echo "Warning: Boot device not found, skipping"
-                exit 0
-            fi
-        fi
+        # Create tags, keeping references so inserts skip the tag-table lookup
+        self.tag_command = self.terminal_buffer.create_tag("command", weight=Pango.Weight.BOLD, foreground="#62a0ea") # Blue
+        self.tag_success = self.terminal_buffer.create_tag("success", foreground="#57e389") # Green
+        self.tag_error = self.terminal_buffer.create_tag("error", foreground="#ff7b63") # Red
+        self.tag_info = self.terminal_buffer.create_tag("info", foreground="#f6d32d") # Yellow
+        self._terminal_tags = {
+            "command": self.tag_command,
+            "success": self.tag_success,
+            "error": self.tag_error,
+            "info": self.tag_info,
+        }
         
-        # Verify the device is a block device
-        if [ ! -b "$BOOT_DEVICE" ]; then
-            echo "Warning: $BOOT_DEVICE is not a block device, skipping boot mount"
-            exit 0
-        fi
+        self.scrolled_window.set_child(self.terminal_view)
         
-        # Create mount point
-        mkdir -p /tmp/linexin_installer/root/boot
-        
-        # Mount the boot partition based on filesystem type
-        echo "Mounting boot device: $BOOT_DEVICE"
-        
-        case "$FS_TYPE" in
-            btrfs)
-                if [ ! -z "$BOOT_SUBVOL" ] && [ "$BOOT_SUBVOL" != "" ]; then
-                    # Mount Btrfs subvolume
-                    echo "Mounting Btrfs boot subvolume: $BOOT_SUBVOL"
-                    mount -t btrfs -o subvol="$BOOT_SUBVOL" "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                else
-                    echo "Mounting Btrfs boot (no subvolume)"
-                    mount -t btrfs "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                fi
-                ;;
-                
-            ext2|ext3|ext4)
-                echo "Mounting ext boot filesystem"
-                mount -t "$FS_TYPE" "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                ;;
-                
-            xfs)
-                echo "Mounting XFS boot filesystem"
-                mount -t xfs "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                ;;
-                
-            vfat|msdos)
-                echo "Mounting FAT boot filesystem (EFI)"
-                mount -t "$FS_TYPE" "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                ;;
-                
-            ntfs|ntfs-3g)
-                echo "Mounting NTFS boot filesystem"
-                mount -t ntfs3 "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot" 2>/dev/null || \
-                mount -t ntfs-3g "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                ;;
-                
-            *)
-                echo "Filesystem type: $FS_TYPE - attempting auto-detect mount"
-                mount "$BOOT_DEVICE" "/tmp/linexin_installer/root/boot"
-                ;;
-        esac
+        self.details_revealer.set_child(self.terminal_frame)
         
-        # Check if mount was successful
-        if [ $? -eq 0 ]; then
-            echo "Successfully mounted boot partition"
-            if mountpoint -q /tmp/linexin_installer/root/boot; then
-                echo "Boot mount point verification successful"
-                df -h /tmp/linexin_installer/root/boot
-                
-                # Check for EFI files
-                if [ -d "/tmp/linexin_installer/root/boot/EFI" ]; then
-                    echo "EFI directory found - this is an EFI boot partition"
-                elif [ -d "/tmp/linexin_installer/root/boot/grub" ] || [ -d "/tmp/linexin_installer/root/boot/grub2" ]; then
-                    echo "GRUB directory found - this is a BIOS/Legacy boot partition"
-                fi
-            fi
-        else
-            echo "Warning: Failed to mount boot partition"
-            echo "This may not be critical if boot is part of the root partition"
-            
-            # Check if /boot exists on root
-            if [ -d "/tmp/linexin_installer/root/boot" ]; then
-                echo "Boot directory exists on root partition"
-                ls -la /tmp/linexin_installer/root/boot/ 2>/dev/null | head -5
-            fi
-            
-            exit 0
-        fi
-        """
-    
-    
+        # Right gravity keeps the mark after every insert at the end
+        self._end_mark = self.terminal_buffer.create_mark(
+            None, self.terminal_buffer.get_end_iter(), False
+        )
+
+        self._insert_terminal_lines(list(self._unshown_log))
+        self._unshown_log.clear()
+        self._scroll_pending = True
+        self._start_tick()
+
+    def _attach_pulse(self, widget):
+        """Pulse the widget while the pointer hovers over it."""
+        hover = Gtk.EventControllerMotion()
+        hover.connect("enter", self._on_pulse_enter, widget)
+        hover.connect("leave", self._on_pulse_leave, widget)
+        widget.add_controller(hover)
+
+    def _on_pulse_enter(self, controller, x, y, widget):
+        widget.add_css_class("pulse-animation")
+
+    def _on_pulse_leave(self, controller, widget):
+        widget.remove_css_class("pulse-animation")
+
     def _get_mount_extra_partitions_command(self):
         """Generate a bash command to parse fstab and mount other partitions (home, var, etc)."""
         return r"""
@@ -829,6 +958,59 @@ class InstallationWidget(Gtk.Box):
         done
         """
 
+    def _get_copy_system_command(self):
+        """Generate a bash command that copies the system image onto the target root.
+
+        A tar pipe copies without rsync's per-file verbose listing and delta
+        bookkeeping, and keeps ACLs, xattrs and hard links. The image is a
+        loop mount, never on the target's filesystem, so no target type can
+        share extents with it and one method serves them all. tar itself is
+        silent, so the extracting side prints a line every 10000 records
+        (about 100 MiB) to show the step is still moving.
+        """
+        return r"""
+        set -o pipefail
+        echo "Copying system image with tar"
+        tar -C /tmp/linexin_installer/rootfs --acls --xattrs --xattrs-include='*' --numeric-owner -cf - . | \
+            tar -C /tmp/linexin_installer/root --acls --xattrs --xattrs-include='*' --numeric-owner -xpf - \
+                --checkpoint=10000 \
+                --checkpoint-action=exec='echo "Copied $((TAR_CHECKPOINT * 10 / 1024)) MiB"'
+        """
+
+    def _get_verify_copy_command(self):
+        """Generate a bash command that checks the copy without walking the whole tree.
+
+        Images that ship a /MANIFEST are verified by comparing it with the
+        copied one; otherwise every top-level entry of the image must exist
+        on the target.
+        """
+        return r"""
+        SRC="/tmp/linexin_installer/rootfs"
+        DST="/tmp/linexin_installer/root"
+        
+        if [ -f "$SRC/MANIFEST" ]; then
+            if cmp -s "$SRC/MANIFEST" "$DST/MANIFEST"; then
+                echo "Image manifest matches: $(head -n1 "$SRC/MANIFEST")"
+                exit 0
+            fi
+            echo "Error: copied MANIFEST does not match the image"
+            exit 1
+        fi
+        
+        echo "No image manifest, checking top-level entries"
+        MISSING=0
+        for ENTRY in "$SRC"/* "$SRC"/.[!.]*; do
+            [ -e "$ENTRY" ] || [ -L "$ENTRY" ] || continue
+            NAME="${ENTRY#$SRC/}"
+            if [ ! -e "$DST/$NAME" ] && [ ! -L "$DST/$NAME" ]; then
+                echo "Missing on target: /$NAME"
+                MISSING=1
+            fi
+        done
+        [ $MISSING -eq 0 ] && echo "All top-level entries present"
+        exit $MISSING
+        """
+
     def _get_copy_config_command(self):
         """Generate a bash command to copy installer configuration files."""
         return """
@@ -848,6 +1030,67 @@ class InstallationWidget(Gtk.Box):
         echo "Configuration files copied successfully"
         """
 
+    def _get_prepare_chroot_command(self):
+        """Generate a bash command that mounts the API filesystems into the target root.
+
+        Does once what arch-chroot does on every call, so the chroot steps
+        can use plain chroot. The mounts stay until the final umount -R of
+        the root (or the cleanup after a failed or cancelled install).
+        """
+        return r"""
+        set -e
+        ROOT_MNT="/tmp/linexin_installer/root"
+        
+        mkdir -p "$ROOT_MNT"/{proc,sys,dev,run,tmp,etc}
+        mountpoint -q "$ROOT_MNT/proc" || mount -t proc -o nosuid,noexec,nodev proc "$ROOT_MNT/proc"
+        if ! mountpoint -q "$ROOT_MNT/sys"; then
+            # rbind carries efivarfs along for the bootloader step
+            mount --rbind /sys "$ROOT_MNT/sys"
+            mount --make-rslave "$ROOT_MNT/sys"
+        fi
+        if ! mountpoint -q "$ROOT_MNT/dev"; then
+            mount --rbind /dev "$ROOT_MNT/dev"
+            mount --make-rslave "$ROOT_MNT/dev"
+        fi
+        if ! mountpoint -q "$ROOT_MNT/run"; then
+            mount --bind /run "$ROOT_MNT/run"
+            mount --make-slave "$ROOT_MNT/run"
+        fi
+        mountpoint -q "$ROOT_MNT/tmp" || mount -t tmpfs -o mode=1777,strictatime,nodev,nosuid tmp "$ROOT_MNT/tmp"
+        
+        # Name resolution for pacman/flatpak: a symlinked resolv.conf (e.g. the
+        # systemd-resolved stub under /run) already works through the /run bind
+        if [ -e /etc/resolv.conf ] && [ ! -L "$ROOT_MNT/etc/resolv.conf" ]; then
+            [ -e "$ROOT_MNT/etc/resolv.conf" ] || touch "$ROOT_MNT/etc/resolv.conf"
+            mount --bind "$(readlink -f /etc/resolv.conf)" "$ROOT_MNT/etc/resolv.conf"
+        fi
+        
+        echo "Chroot environment ready"
+        """
+
+    def _get_prefetch_flatpaks_command(self, app_ids):
+        """Generate a bash command that starts pulling Flatpak apps into the target's repo.
+
+        The live system's flatpak downloads into the copied
+        /var/lib/flatpak with --no-deploy, so it needs nothing mounted
+        inside the chroot. The download keeps FLATPAK_PREFETCH_LOCK locked
+        until it finishes and runs in its own process group, whose ID is
+        written to FLATPAK_PREFETCH_PID.
+        """
+        return f"""
+        if ! command -v flatpak >/dev/null 2>&1; then
+            echo "flatpak not available on the live system, apps will be downloaded later"
+            exit 0
+        fi
+        exec 9>{FLATPAK_PREFETCH_LOCK}
+        flock 9
+        FLATPAK_SYSTEM_DIR=/tmp/linexin_installer/root/var/lib/flatpak \\
+            setsid flatpak install --system --noninteractive --no-deploy --assumeyes \\
+            {shlex.join(app_ids)} </dev/null >{FLATPAK_PREFETCH_LOG} 2>&1 &
+        echo $! >{FLATPAK_PREFETCH_PID}
+        echo "Downloading {len(app_ids)} Flatpak app(s) in the background"
+        """
+
     def _get_copy_kernel_command(self):
         """Generate a bash command to reliably copy the kernel from the live media."""
         return """
@@ -914,14 +1157,14 @@ class InstallationWidget(Gtk.Box):
         ROOT_MNT="/tmp/linexin_installer/root"
         SIZE_MB=""" + str(int(size_mb)) + r"""
 
-        if ! mountpoint -q "$ROOT_MNT"; then
+        if ! grep -q " $ROOT_MNT " /proc/self/mounts; then
             echo "Root not mounted, skipping swap file creation"
             exit 0
         fi
 
         # Prefer the dedicated @swap subvolume (Btrfs) when it is mounted so the
         # swap file stays out of / snapshots; fall back to the root otherwise.
-        if mountpoint -q "$ROOT_MNT/swap"; then
+        if grep -q " $ROOT_MNT/swap " /proc/self/mounts; then
             SWAP_DIR="$ROOT_MNT/swap"
             SWAP_FSTAB_PATH="/swap/swapfile"
         else
@@ -985,42 +1228,30 @@ class InstallationWidget(Gtk.Box):
         # Setup installation steps
         steps = []
         
-        # All commands will be run with sudo since we're on live-cd with passwordless sudo
-        steps.append(InstallationStep(
-            label="Creating installation directories",
-            command=["sudo", "mkdir", "-p", "/tmp/linexin_installer/rootfs", "/tmp/linexin_installer/root"],
-            description="Setting up temporary installation directories",
-            weight=0.5,
-            critical=True
-        ))
-        
+        # All commands will be run with sudo since we're on live-cd with passwordless sudo.
+        # Trivial neighbouring operations share one sudo/chroot invocation.
         steps.append(InstallationStep(
             label="Mounting installation image",
-            command=["sudo", "mount", loop_device, "/tmp/linexin_installer/rootfs"],
+            command=["sudo", "bash", "-c",
+                     "mkdir -p /tmp/linexin_installer/rootfs /tmp/linexin_installer/root && "
+                     f"mount {shlex.quote(loop_device)} /tmp/linexin_installer/rootfs"],
             description=f"Mounting {loop_device} containing the system image",
-            weight=1.0,
+            weight=1.5,
             critical=True
         ))
         
         steps.append(InstallationStep(
             label="Mounting root partition",
-            command=["sudo", "bash", "-c", self._get_mount_root_command()],
+            command=["sudo", "bash", "-c", self._MOUNT_ROOT_CMD],
             description="Mounting the root partition based on /etc/fstab",
             weight=1.0,
             critical=True
         ))
         
-        steps.append(InstallationStep(
-            label="Creating boot directory",
-            command=["sudo", "mkdir", "-p", "/tmp/linexin_installer/root/boot"],
-            description="Creating boot mount point",
-            weight=0.2,
-            critical=False
-        ))
-        
+        # The boot mount script creates /boot itself when there is a /boot entry
         steps.append(InstallationStep(
             label="Mounting boot partition",
-            command=["sudo", "bash", "-c", self._get_mount_boot_command()],
+            command=["sudo", "bash", "-c", self._MOUNT_BOOT_CMD],
             description="Mounting the boot partition based on /etc/fstab",
             weight=1.0,
             critical=False
@@ -1036,7 +1267,7 @@ class InstallationWidget(Gtk.Box):
         
         steps.append(InstallationStep(
             label="Copying system files",
-            command=["sudo", "rsync", "-aAXv", "--info=progress2", "/tmp/linexin_installer/rootfs/", "/tmp/linexin_installer/root/"],
+            command=["sudo", "bash", "-c", self._get_copy_system_command()],
             description="Copying the system image to your disk. This may take several minutes...",
             weight=10.0,
             critical=True
@@ -1044,25 +1275,18 @@ class InstallationWidget(Gtk.Box):
         
         steps.append(InstallationStep(
             label="Verifying file copy",
-            command=["sudo", "bash", "-c", "echo 'Files copied:' && find /tmp/linexin_installer/root -type f | wc -l"],
+            command=["sudo", "bash", "-c", self._get_verify_copy_command()],
             description="Verifying that files were copied successfully",
             weight=0.5,
             critical=True
         ))
         
-        steps.append(InstallationStep(
-            label="Removing live ISO fstab",
-            command=["sudo", "rm", "-f", "/etc/fstab"],
-            description="Removing the live ISO filesystem configuration",
-            weight=0.1,
-            critical=False
-        ))
-        
         steps.append(InstallationStep(
             label="Applying installer configuration",
-            command=["sudo", "bash", "-c", self._get_copy_config_command()],
+            command=["sudo", "bash", "-c",
+                     "# Remove the live ISO fstab first\nrm -f /etc/fstab\n" + self._get_copy_config_command()],
             description="Copying installer configuration files to the new system",
-            weight=1.0,
+            weight=1.1,
             critical=False
         ))
 
@@ -1099,65 +1323,118 @@ class InstallationWidget(Gtk.Box):
             critical=True
         ))
 
+        # Determine which Flatpak packages to install.
+        # If there is no advanced selection file, install all suggested Flatpaks by default.
+        all_flatpaks = [
+            "app.zen_browser.zen",
+            "io.github.Faugus.faugus-launcher",
+            "it.mijorus.gearlever",
+            "com.github.tchx84.Flatseal",
+            "com.usebottles.bottles",
+            "app.twintaillauncher.ttl",
+            "com.heroicgameslauncher.hgl",
+        ]
+
+        selected_flatpaks = list(all_flatpaks)  # default: all
+        try:
+            import json
+            pkg_config = "/tmp/installer_config/selected_packages"
+            if os.path.exists(pkg_config):
+                with open(pkg_config, 'r') as f:
+                    selected_ids = json.loads(f.read().strip())
+                selected_flatpaks = [p for p in all_flatpaks if p in selected_ids]
+                print(f"Custom package selection: {selected_flatpaks}")
+        except Exception as e:
+            print(f"Error reading package selection, using defaults: {e}")
+
+        if selected_flatpaks:
+            # Only the two Flatpak steps below touch the repo, and the first
+            # of them waits for the download, so it overlaps everything between
+            steps.append(InstallationStep(
+                label="Downloading Flatpak apps",
+                command=["sudo", "bash", "-c", self._get_prefetch_flatpaks_command(selected_flatpaks)],
+                description="Downloading Flatpak apps in the background",
+                weight=0.5,
+                critical=False
+            ))
+
+        steps.append(InstallationStep(
+            label="Preparing chroot",
+            command=["sudo", "bash", "-c", self._get_prepare_chroot_command()],
+            description="Mounting system filesystems inside the new root for the setup scripts",
+            weight=0.1,
+            critical=True
+        ))
+
         steps.append(InstallationStep(
             label="Removing wheel sudo configuration",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "rm", "/etc/sudoers.d/g_wheel"],
+            command=[*CHROOT_PREFIX, "rm", "/etc/sudoers.d/g_wheel"],
             description="Removing temporary sudo configuration",
             weight=0.1,
-            critical=False
+            critical=False,
+            group="chroot-setup"
         ))
         
         steps.append(InstallationStep(
             label="Changing system's language",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/language.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/language.sh"],
             description="Changing system's language to a selected one",
             weight=1.0,
-            critical=False
+            critical=False,
+            group="chroot-setup",
+            concurrent=True
         ))
 
         steps.append(InstallationStep(
             label="Setting up timezone",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/setup_timezone.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/setup_timezone.sh"],
             description="Linking timezone to the selected one in the installer",
             weight=1.0,
-            critical=False
+            critical=False,
+            group="chroot-setup",
+            concurrent=True
         ))
 
         steps.append(InstallationStep(
             label="Setting up keyboard layout",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/setup_keyboard.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/setup_keyboard.sh"],
             description="Using proper commands in chroot environment to set up keyboard layout",
             weight=1.0,
-            critical=False
+            critical=False,
+            group="chroot-setup",
+            concurrent=True
         ))
 
         steps.append(InstallationStep(
             label="Adding user",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/add_users.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/add_users.sh"],
             description="Adding user, setting it's password and hostname for the PC",
             weight=1.0,
-            critical=False
+            critical=False,
+            group="chroot-setup"
         ))
 
         steps.append(InstallationStep(
             label="Removing unused microcode",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/remove_ucode.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/remove_ucode.sh"],
             description="Removing ucode for non-used x86_64 processor",
             weight=1.0,
-            critical=False
+            critical=False,
+            group="chroot-setup"
         ))
 
         steps.append(InstallationStep(
             label="Cleaning out rootfs",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/post-install.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/post-install.sh"],
             description="Cleaning out rootfs from LiveISO's config and applying post-install scripts",
             weight=5.0,
-            critical=True
+            critical=True,
+            group="chroot-setup"
         ))
 
         steps.append(InstallationStep(
             label="Installing bootloader",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/bootloader.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/bootloader.sh"],
             description="Checking for other systems installed and installing proper bootloader",
             weight=3.0,
             critical=True
@@ -1165,48 +1442,30 @@ class InstallationWidget(Gtk.Box):
         
         steps.append(InstallationStep(
             label="Removing unused GPU drivers",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/remove_gpu.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/remove_gpu.sh"],
             description="Removing unused GPU drivers",
             weight=3.0,
-            critical=False
+            critical=False,
+            group="chroot-cleanup"
         ))
 
         steps.append(InstallationStep(
             label="Removing unused microcode",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "/remove_ucode.sh"],
+            command=[*CHROOT_PREFIX, "bash", "-c", "/remove_ucode.sh"],
             description="Removing unused microcode",
             weight=3.0,
-            critical=False
+            critical=False,
+            group="chroot-cleanup"
         ))
 
-        # Determine which Flatpak packages to install.
-        # If there is no advanced selection file, install all suggested Flatpaks by default.
-        all_flatpaks = [
-            "app.zen_browser.zen",
-            "io.github.Faugus.faugus-launcher",
-            "it.mijorus.gearlever",
-            "com.github.tchx84.Flatseal",
-            "com.usebottles.bottles",
-            "app.twintaillauncher.ttl",
-            "com.heroicgameslauncher.hgl",
-        ]
-
-        selected_flatpaks = list(all_flatpaks)  # default: all
-        try:
-            import json
-            pkg_config = "/tmp/installer_config/selected_packages"
-            if os.path.exists(pkg_config):
-                with open(pkg_config, 'r') as f:
-                    selected_ids = json.loads(f.read().strip())
-                selected_flatpaks = [p for p in all_flatpaks if p in selected_ids]
-                print(f"Custom package selection: {selected_flatpaks}")
-        except Exception as e:
-            print(f"Error reading package selection, using defaults: {e}")
-
         if selected_flatpaks:
             steps.append(InstallationStep(
                 label="Setting up Flatpak",
-                command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "flatpak", "update", "--appstream"],
+                command=["sudo", "bash", "-c",
+                         # Wait for the background download before writing the repo
+                         f"flock {FLATPAK_PREFETCH_LOCK} true; "
+                         f"cat {FLATPAK_PREFETCH_LOG} 2>/dev/null; "
+                         + shlex.join([*CHROOT_PREFIX[1:], "flatpak", "update", "--appstream"])],
                 description="Installing Flatpak apps and support for AppImage",
                 weight=5.0,
                 critical=False
@@ -1214,7 +1473,7 @@ class InstallationWidget(Gtk.Box):
 
             steps.append(InstallationStep(
                 label="Installing Flatpak and AppImage support",
-                command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "flatpak", "install"] + selected_flatpaks + ["--assumeyes"],
+                command=[*CHROOT_PREFIX, "flatpak", "install"] + selected_flatpaks + ["--assumeyes"],
                 description="Installing Flatpak apps and support for AppImage",
                 weight=5.0,
                 critical=False
@@ -1231,7 +1490,7 @@ class InstallationWidget(Gtk.Box):
                     print(f"Removing user-deselected packages: {removed_pkgs}")
                     steps.append(InstallationStep(
                         label="Removing deselected packages",
-                        command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "pacman", "-Rns", "--noconfirm"] + removed_pkgs,
+                        command=[*CHROOT_PREFIX, "pacman", "-Rns", "--noconfirm"] + removed_pkgs,
                         description="Removing packages deselected in Advanced Setup",
                         weight=3.0,
                         critical=False
@@ -1239,22 +1498,16 @@ class InstallationWidget(Gtk.Box):
         except Exception as e:
             print(f"Error reading removed packages config: {e}")
 
-        steps.append(InstallationStep(
-            label="Cleaning out rootfs",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c", "rm /*.sh"],
-            description="Cleaning out rootfs from LiveISO's config and applying post-install scripts",
-            weight=1.0,
-            critical=False
-        ))
-
-        # Snapshot tooling. Runs after the rootfs cleanup so the first snapshot is
-        # clean, and after the bootloader step so the systemd-boot template exists.
+        # Snapshot tooling. Runs after the rootfs cleanup (the installer scripts
+        # are removed in the same chroot first) so the first snapshot is clean,
+        # and after the bootloader step so the systemd-boot template exists.
         steps.append(InstallationStep(
             label="Installing snapshot tools",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c",
+            command=[*CHROOT_PREFIX, "bash", "-c",
+                     "rm -f /*.sh; "
                      "pacman -S --needed --noconfirm timeshift btrfs-progs 2>/dev/null || true"],
             description="Ensuring Timeshift and btrfs-progs are present on the new system",
-            weight=1.0,
+            weight=2.0,
             critical=False
         ))
 
@@ -1263,7 +1516,7 @@ class InstallationWidget(Gtk.Box):
         # On ext4: just discard the staged hook.
         steps.append(InstallationStep(
             label="Enabling snapshot automation",
-            command=["sudo", "arch-chroot", "/tmp/linexin_installer/root", "bash", "-c",
+            command=[*CHROOT_PREFIX, "bash", "-c",
                      'if [ "$(findmnt -no FSTYPE /)" = "btrfs" ]; then '
                      'chmod +x /usr/local/bin/linexin-snapshot 2>/dev/null; '
                      '/usr/local/bin/linexin-snapshot configure; '
@@ -1290,27 +1543,49 @@ class InstallationWidget(Gtk.Box):
         ))
         
         self.installation_steps = steps
+
+        # Guard against an empty or zero-weight step list so progress
+        # calculation never divides by zero.
+        self._total_weight = sum(step.weight for step in steps) or 1.0
+
+        # Localize once here instead of on every step change
+        localization_manager = get_localization_manager()
+        step_word = localization_manager.get_text('Step')
+        of_total = f"{localization_manager.get_text('of')} {len(steps)}"
+        self._step_texts = [
+            (localization_manager.get_text(step.label),
+             localization_manager.get_text(step.description),
+             f"{step_word} {index + 1} {of_total}")
+            for index, step in enumerate(steps)
+        ]
+        self._elapsed_text = localization_manager.get_text('Elapsed time')
         
         self.state = InstallationState.RUNNING
         self.current_step = 0
         self.should_cancel = False
         self.start_time = time.time()
+        # Same monotonic clock as Gdk.FrameClock.get_frame_time()
+        self._start_frame_time = GLib.get_monotonic_time()
+        self._last_sec = -1
+        self._pending_step = None
+        self._pending_progress = None
         self.log_buffer.clear()
+        self._start_tick()
         
         # Clear terminal
-        self.terminal_buffer.set_text("")
+        self._pending_log.clear()
+        self._unshown_log.clear()
+        if self.terminal_buffer is not None:
+            self.terminal_buffer.set_text("")
         
         # Update UI
         self.btn_cancel.set_sensitive(True)
         self.btn_continue.set_visible(False)
-        localization_manager = get_localization_manager()
         self.title.set_markup(f'<span size="xx-large" weight="bold">{localization_manager.get_text("Installing System")}</span>')
 
         
         # Start installation thread
         self.spinner.start()
-        # Start queue processing (100ms interval)
-        GLib.timeout_add(100, self._process_terminal_queue)
         
         self.installation_thread = threading.Thread(target=self._run_installation)
         self.installation_thread.daemon = True
@@ -1319,115 +1594,344 @@ class InstallationWidget(Gtk.Box):
     
     def _run_installation(self):
         """Run the installation process in a separate thread."""
-        total_weight = sum(step.weight for step in self.installation_steps)
-        # Guard against an empty or zero-weight step list so progress
-        # calculation below never divides by zero.
-        if total_weight <= 0:
-            total_weight = 1.0
+        total_weight = self._total_weight
         completed_weight = 0.0
-        
-        for i, step in enumerate(self.installation_steps):
+
+        try:
+            self._start_shell()
+        except Exception as e:
+            error_msg = f"Error starting installation shell: {str(e)}"
+            self._append_to_terminal(error_msg, "error")
+            GLib.idle_add(self._on_installation_error, error_msg)
+            return
+
+        try:
+            self._run_steps(total_weight, completed_weight)
+        finally:
+            self._stop_shell(kill=self.should_cancel)
+
+    def _run_steps(self, total_weight: float, completed_weight: float):
+        """Run every installation step in order, step groups in one chroot session."""
+        steps = self.installation_steps
+        i = 0
+        while i < len(steps):
             if self.should_cancel:
                 GLib.idle_add(self._on_installation_cancelled)
                 return
             
+            step = steps[i]
+            batch = [step]
+            if step.group:
+                while i + len(batch) < len(steps) and steps[i + len(batch)].group == step.group:
+                    batch.append(steps[i + len(batch)])
+            
             self.current_step = i
             
             # Update UI
-            GLib.idle_add(self._update_step_info, step, i)
+            self._pending_step = (step, i)
             
-            # Log command execution - PUSH TO QUEUE
-            self.output_queue.put((f"$ {' '.join(step.command)}", "command"))
+            # Log command execution
+            for batch_step in batch:
+                self._append_to_terminal(f"$ {' '.join(batch_step.command)}", "command")
             
             try:
-                # Execute command.
-                # encoding+errors="replace" guards against non-UTF-8 bytes in
-                # tool output (e.g. efibootmgr EFI device-path data) that
-                # would otherwise raise UnicodeDecodeError and abort the step.
-                process = subprocess.Popen(
-                    step.command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    encoding="utf-8",
-                    errors="replace",
-                    bufsize=1,
-                )
+                if len(batch) == 1:
+                    returncodes = [self._run_in_shell(step.command)]
+                else:
+                    returncodes = self._run_chroot_session(batch, i, completed_weight, total_weight)
+
+                if None in returncodes:
+                    GLib.idle_add(self._on_installation_cancelled)
+                    return
 
-                # Drain stderr on a dedicated thread.
-                def _drain_stderr(proc=process):
-                    try:
-                        for line in proc.stderr:
-                            self.output_queue.put((line.rstrip(), "error"))
-                    except Exception:
-                        pass
-
-                stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
-                stderr_thread.start()
-
-                # Read stdout in real-time
-                while True:
-                    if self.should_cancel:
-                        process.terminate()
-                        GLib.idle_add(self._on_installation_cancelled)
-                        return
-
-                    output = process.stdout.readline()
-                    if output:
-                        self.output_queue.put((output.rstrip(), None))
-                        continue
-
-                    # readline() returns "" only at EOF.
-                    if process.poll() is not None:
-                        break
-
-                process.wait()
-                stderr_thread.join(timeout=5)
-
-                # Check return code
-                if process.returncode != 0:
-                    if step.critical:
-                        error_msg = f"Step failed: {step.label} (exit code: {process.returncode})"
-                        self.output_queue.put((error_msg, "error"))
-                        GLib.idle_add(self._on_installation_error, error_msg)
-                        return
+                # Check return codes
+                for batch_step, returncode in zip(batch, returncodes):
+                    if returncode != 0:
+                        if batch_step.critical:
+                            error_msg = f"Step failed: {batch_step.label} (exit code: {returncode})"
+                            self._append_to_terminal(error_msg, "error")
+                            GLib.idle_add(self._on_installation_error, error_msg)
+                            return
+                        else:
+                            warning_msg = f"Warning: Non-critical step failed: {batch_step.label}"
+                            self._append_to_terminal(warning_msg, "info")
                     else:
-                        warning_msg = f"Warning: Non-critical step failed: {step.label}"
-                        self.output_queue.put((warning_msg, "info"))
-                else:
-                    self.output_queue.put((f"✓ {step.label} completed successfully", "success"))
+                        self._append_to_terminal(f"✓ {batch_step.label} completed successfully", "success")
                 
             except Exception as e:
                 error_msg = f"Error executing step '{step.label}': {str(e)}"
-                self.output_queue.put((error_msg, "error"))
-                if step.critical:
+                self._append_to_terminal(error_msg, "error")
+                if any(batch_step.critical for batch_step in batch):
                     GLib.idle_add(self._on_installation_error, error_msg)
                     return
             
             # Update progress (Finalize step)
-            completed_weight += step.weight
+            completed_weight += sum(batch_step.weight for batch_step in batch)
             progress = completed_weight / total_weight
-            GLib.idle_add(self._update_progress, progress)
-            
-            # Reduced delay
-            time.sleep(0.1)
+            self._pending_progress = progress
+            i += len(batch)
         
         # Installation complete
         GLib.idle_add(self._on_installation_complete)
-    
+
+    def _run_chroot_session(self, steps: List[InstallationStep], first_index: int,
+                            completed_weight: float, total_weight: float) -> List[Optional[int]]:
+        """Run a group of chroot steps in a single chroot shell.
+
+        The group's scripts share one sudo and chroot'd bash instead of
+        starting one each, and report back through SESSION_MARKER lines.
+        A failing critical step ends the session. Adjacent non-critical
+        concurrent steps start together in the background, their output
+        prefixed with the step label, and the session waits for all of them.
+        Returns the exit statuses in step order, with None for every step
+        when the installation was cancelled.
+        """
+        for step in steps:
+            if step.command[:len(CHROOT_PREFIX)] != CHROOT_PREFIX:
+                raise ValueError(f"step '{step.label}' does not run in the chroot")
+
+        lines = []
+        n = 0
+        while n < len(steps):
+            step = steps[n]
+            command = shlex.join(step.command[len(CHROOT_PREFIX):])
+            lines.append(f"echo '{SESSION_MARKER}STEP {n}'")
+            if not (step.concurrent and not step.critical):
+                lines.append(f"{command} </dev/null")
+                lines.append(f"RC=$?; echo \"{SESSION_MARKER}RC {n} $RC\"")
+                if step.critical:
+                    lines.append("[ $RC -eq 0 ] || exit $RC")
+                n += 1
+                continue
+
+            while n < len(steps) and steps[n].concurrent and not steps[n].critical:
+                command = shlex.join(steps[n].command[len(CHROOT_PREFIX):])
+                label = steps[n].label.replace("\\", "\\\\").replace("&", "\\&").replace("|", "\\|")
+                prefix = shlex.quote(f"s|^|[{label}] |")
+                # The RC marker stays outside the sed pipe, unprefixed
+                lines.append(f"{{ {command} </dev/null 2> >(sed -u {prefix} >&2) | sed -u {prefix}; "
+                             f"echo \"{SESSION_MARKER}RC {n} ${{PIPESTATUS[0]}}\"; }} &")
+                n += 1
+            lines.append("wait")
+        script = (f"{shlex.join(CHROOT_PREFIX)} bash -s <<'__LINEXIN_SESSION__'\n"
+                  + "\n".join(lines) + "\n__LINEXIN_SESSION__")
+
+        returncodes: List[Optional[int]] = [None] * len(steps)
+
+        def on_marker(payload: str):
+            fields = payload.split()
+            n = int(fields[1])
+            if fields[0] == "STEP":
+                self.current_step = first_index + n
+                self._pending_step = (steps[n], first_index + n)
+            else:
+                returncodes[n] = int(fields[2])
+                # Concurrent steps may finish in any order
+                done = completed_weight + sum(
+                    step.weight for step, rc in zip(steps, returncodes) if rc is not None
+                )
+                self._pending_progress = done / total_weight
+
+        status = self._run_shell_script(script, on_marker)
+        if status is None:
+            return [None] * len(steps)
+        # Steps left without a status never ran: the session ended early
+        return [status or 1 if rc is None else rc for rc in returncodes]
+
+    def _start_shell(self):
+        """Spawn the bash co-process that runs every installation step.
+
+        One long-lived shell replaces a Popen, a pipe pair and a stderr reader
+        thread per step. It gets its own session so a cancel can signal the
+        whole process group, including the sudo child of the running step.
+        """
+        self._shell = subprocess.Popen(
+            ["bash", "--norc", "--noprofile", "-s"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=True,
+        )
+        self._shell_output = self._iter_output_lines(self._shell.stdout.fileno())
+
+        # Drain stderr on a dedicated thread for the lifetime of the shell.
+        def _drain_stderr(proc=self._shell):
+            try:
+                for lines in self._iter_output_lines(proc.stderr.fileno()):
+                    self._extend_step_output(lines, "error")
+            except Exception:
+                pass
+
+        threading.Thread(target=_drain_stderr, daemon=True).start()
+
+    def _stop_shell(self, kill: bool = False):
+        """Let the step shell exit, or terminate its process group if kill."""
+        shell = self._shell
+        if shell is None:
+            return
+        self._shell = None
+        self._shell_output = None
+        try:
+            if kill:
+                os.killpg(shell.pid, signal.SIGTERM)
+            shell.stdin.close()
+            shell.wait(timeout=5)
+        except Exception:
+            self._kill_process_group(shell.pid, signal.SIGKILL)
+
+    def _run_in_shell(self, command: Tuple[str, ...]) -> Optional[int]:
+        """Run one step in the step shell, streaming its stdout to the terminal.
+
+        Returns the command's exit status, or None if the installation was
+        cancelled while it ran.
+        """
+        # stdin is the shell's script stream, so steps must never read it
+        return self._run_shell_script(f"{shlex.join(command)} </dev/null")
+
+    def _run_shell_script(self, script: str, on_marker: Optional[Callable[[str], None]] = None) -> Optional[int]:
+        """Run a bash snippet in the step shell and return its exit status.
+
+        If on_marker is given, SESSION_MARKER lines are passed to it (without
+        the marker) instead of being shown in the terminal.
+        """
+        self._shell.stdin.write(f"{script}\necho {STEP_DONE_MARKER}$?__\n".encode())
+
+        for lines in self._shell_output:
+            if on_marker is not None:
+                lines = self._take_session_markers(lines, on_marker)
+            for n, line in enumerate(lines):
+                marker = line.find(STEP_DONE_MARKER)
+                if marker < 0:
+                    continue
+                # Output without a trailing newline shares the marker's line
+                if marker > 0:
+                    lines[n] = line[:marker]
+                    n += 1
+                if n:
+                    self._extend_step_output(lines[:n])
+                return int(line[marker + len(STEP_DONE_MARKER):].strip("_"))
+
+            self._extend_step_output(lines)
+            if self.should_cancel:
+                return None
+
+        # EOF: either _interrupt_shell() killed it on cancel, or it died
+        if self.should_cancel:
+            return None
+        raise Exception("installation shell exited unexpectedly")
+
+    def _take_session_markers(self, lines: List[str], on_marker: Callable[[str], None]) -> List[str]:
+        """Hand SESSION_MARKER lines to on_marker and return the remaining output."""
+        shown = []
+        for line in lines:
+            marker = line.find(SESSION_MARKER)
+            if marker < 0:
+                shown.append(line)
+                continue
+            # Output without a trailing newline shares the marker's line
+            if marker > 0:
+                shown.append(line[:marker])
+            on_marker(line[marker + len(SESSION_MARKER):])
+        return shown
+
+    def _interrupt_shell(self):
+        """Terminate the running step right away; called on cancel."""
+        if self._shell is None:
+            return
+        pgid = self._shell.pid
+        self._kill_process_group(pgid, signal.SIGTERM)
+        # Anything that ignores SIGTERM and is still running after the grace
+        # period is killed outright
+        GLib.timeout_add(CANCEL_KILL_TIMEOUT_MS, self._kill_process_group, pgid, signal.SIGKILL)
+
+    @staticmethod
+    def _kill_process_group(pgid: int, sig: int):
+        """Send sig to a step process group that may already be gone.
+
+        The steps run under sudo, so os.killpg() only reaches our own shell
+        and sudo itself. sudo relays SIGTERM to the root command, but it
+        cannot relay SIGKILL, so SIGKILL goes to the group through 'sudo kill'.
+        """
+        if sig != signal.SIGKILL:
+            try:
+                os.killpg(pgid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+            return False
+
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return False  # the whole group already exited
+        except PermissionError:
+            pass  # only root-owned processes are left
+
+        def _sudo_kill():
+            try:
+                subprocess.run(["sudo", "kill", "-KILL", "--", f"-{pgid}"],
+                               capture_output=True, timeout=10)
+            except Exception as e:
+                print(f"Could not kill step process group {pgid}: {e}")
+
+        # Off the main loop, in case sudo is slow
+        threading.Thread(target=_sudo_kill, daemon=True).start()
+        return False
+
+    def _iter_output_lines(self, fd: int):
+        """Yield the complete lines of each chunk read from fd until EOF.
+
+        Reading 64 KiB at a time and decoding once per chunk is much cheaper
+        than readline() for chatty tools like pacman. errors="replace" guards
+        against non-UTF-8 bytes (e.g. efibootmgr EFI device-path data) that
+        would otherwise raise UnicodeDecodeError and abort the step.
+        """
+        pending = bytearray()
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            pending += chunk
+            lines = self._take_complete_lines(pending)
+            if lines:
+                yield lines
+        if pending:
+            yield [self._latest_redraw(pending.decode("utf-8", errors="replace"))]
+
+    def _take_complete_lines(self, pending: bytearray) -> List[str]:
+        """Remove and decode every complete line at the start of pending."""
+        cut = pending.rfind(b"\n")
+        if cut < 0:
+            # A progress bar redrawing itself with \r: only its latest
+            # state can still be shown, so don't keep the rest around
+            redraw = pending.rfind(b"\r")
+            if redraw > 0:
+                del pending[:redraw]
+            return []
+        text = pending[:cut].decode("utf-8", errors="replace")
+        del pending[:cut + 1]
+        return [self._latest_redraw(line) for line in text.split("\n")]
+
+    @staticmethod
+    def _latest_redraw(line: str) -> str:
+        """Return what a terminal would show for a line rewritten with \r."""
+        if "\r" in line:
+            line = next((part for part in reversed(line.split("\r")) if part), "")
+        return line.rstrip()
+
     def _update_step_info(self, step: InstallationStep, index: int):
         """Update the UI with current step information."""
-        localization_manager = get_localization_manager()
-        self.operation_label.set_markup(f'<span size="large" weight="bold">{localization_manager.get_text(step.label)}</span>')
-        self.step_description.set_text(localization_manager.get_text(step.description))
-        self.step_counter.set_text(f"{localization_manager.get_text('Step')} {index + 1} {localization_manager.get_text('of')} {len(self.installation_steps)}")
+        label, description, counter = self._step_texts[index]
+        self.operation_label.set_markup(f'<span size="large" weight="bold">{label}</span>')
+        self.step_description.set_text(description)
+        self.step_counter.set_text(counter)
         return False
     
     def _update_progress(self, progress: float):
         """Update the target progress for the progress bar."""
         self.target_progress = progress
-        # Start animation if not running
-        if not hasattr(self, '_progress_timer_id') or self._progress_timer_id is None:
-             self._progress_timer_id = GLib.timeout_add(16, self._animate_progress) # ~60 FPS
+        # Animated from _on_tick, one step per frame
+        self._progress_animating = True
         return False
     
     def _animate_progress(self):
@@ -1441,8 +1945,7 @@ class InstallationWidget(Gtk.Box):
         if abs(diff) < 0.001:
             self.progress_bar.set_fraction(self.target_progress)
             self.progress_bar.set_text(f"{int(self.target_progress * 100)}%")
-            self._progress_timer_id = None
-            return False # Stop timer
+            return False # Stop animating
             
         # Interpolate: Move 10% of the remaining distance per frame, or at least 0.001
         step = diff * 0.1
@@ -1459,24 +1962,30 @@ class InstallationWidget(Gtk.Box):
         self.progress_bar.set_fraction(new_progress)
         self.progress_bar.set_text(f"{int(new_progress * 100)}%")
         
-        return True # Continue timer
+        return True # Continue animating
     
     
-    def _process_terminal_queue(self):
-        """Process buffered terminal output in batches to prevent UI lag."""
-        if self.output_queue.empty():
-            return True 
-            
+    def _flush_log(self):
+        """Write all pending terminal output in one pass to prevent UI lag."""
+        # Clear the flag before draining so a line appended meanwhile
+        # schedules another flush instead of being left behind
+        self._log_flush_scheduled = False
+        # popleft() is atomic, so drain until the reader threads' deque is empty
         lines_to_add = []
+        popleft = self._pending_log.popleft
         try:
-            for _ in range(500):
-                item = self.output_queue.get_nowait()
-                lines_to_add.append(item)
-        except queue.Empty:
+            while True:
+                lines_to_add.append(popleft())
+        except IndexError:
             pass
                 
         if not lines_to_add:
-            return True
+            return False
+
+        self.log_buffer.extend(text for text, _tag in lines_to_add)
+        if self.terminal_view is None:
+            self._unshown_log.extend(lines_to_add)
+            return False
         
         # Smart Autoscroll Check
         # Check if we are at the bottom BEFORE adding new content
@@ -1485,47 +1994,113 @@ class InstallationWidget(Gtk.Box):
         # Epsilon of 1.0 ensures slight floating point differences don't break logic
         should_scroll = distance_from_bottom < 50.0 # Tolerance of 50px
             
-        # Bulk insert
-        end_iter = self.terminal_buffer.get_end_iter()
-        for text, tag in lines_to_add:
-             if tag:
-                 self.terminal_buffer.insert_with_tags_by_name(end_iter, text + "\n", tag)
-             else:
-                 self.terminal_buffer.insert(end_iter, text + "\n")
-             self.log_buffer.append(text)
+        self._insert_terminal_lines(lines_to_add)
                  
         # Scroll ONLY if we were already at the bottom
         if should_scroll:
-            GLib.idle_add(self._scroll_to_bottom)
+            self._scroll_pending = True
+            self._start_tick()
         
-        return True 
+        return False
+
+    def _insert_terminal_lines(self, lines_to_add):
+        """Append (text, tag) lines to the terminal buffer."""
+        # Bulk insert, one buffer insert per run of lines sharing a tag
+        end_iter = self.terminal_buffer.get_end_iter()
+        for tag, run in groupby(lines_to_add, key=lambda item: item[1]):
+            texts = [text for text, _tag in run]
+            chunk = "\n".join(texts) + "\n"
+            if tag:
+                self.terminal_buffer.insert_with_tags(end_iter, chunk, self._terminal_tags[tag])
+            else:
+                self.terminal_buffer.insert(end_iter, chunk)
+
+        # Drop the oldest lines so layout cost stays bounded on verbose steps
+        excess = self.terminal_buffer.get_line_count() - MAX_TERMINAL_LINES
+        if excess > 0:
+            self.terminal_buffer.delete(
+                self.terminal_buffer.get_start_iter(),
+                self.terminal_buffer.get_iter_at_line(excess + TERMINAL_TRIM_LINES)[1]
+            )
         
     def _scroll_to_bottom(self):
         """Scroll terminal to bottom."""
-        adj = self.scrolled_window.get_vadjustment()
-        adj.set_value(adj.get_upper() - adj.get_page_size())
-        return False 
+        # The view defers this until the new lines have been laid out
+        self.terminal_view.scroll_to_mark(self._end_mark, 0.0, False, 0.0, 0.0)
         
     def _append_to_terminal(self, text: str, tag: Optional[str]):
-        """Legacy method: direct append (kept for non-threaded calls if any)."""
-        self.output_queue.put((text, tag))
+        """Queue a line for the terminal; safe to call from any thread."""
+        self._extend_terminal((text,), tag)
         return False
+
+    def _extend_step_output(self, lines: List[str], default_tag: Optional[str] = None):
+        """Queue a step's output lines, tagging the errors and warnings it reports."""
+        for tag, run in groupby(lines, key=lambda line: self._output_line_tag(line, default_tag)):
+            self._extend_terminal(run, tag)
+
+    @staticmethod
+    def _output_line_tag(line: str, default_tag: Optional[str]) -> Optional[str]:
+        """Return the terminal tag for one line of step output."""
+        if _ERROR_LINE_RE.match(line):
+            return "error"
+        if _WARNING_LINE_RE.match(line):
+            return "info"
+        return default_tag
+
+    def _extend_terminal(self, lines, tag: Optional[str]):
+        """Queue several lines sharing one tag; safe to call from any thread."""
+        self._pending_log.extend((line, tag) for line in lines)
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            GLib.timeout_add(LOG_FLUSH_INTERVAL_MS, self._flush_log)
     
-    def _update_timer(self):
-        """Update the elapsed time display."""
-        if self.state == InstallationState.RUNNING and self.start_time:
-            elapsed = int(time.time() - self.start_time)
+    def _start_tick(self):
+        """Run _on_tick every frame until the page has settled again."""
+        # Elapsed time follows the frame clock, so it only ticks while drawn
+        if not self._tick_id:
+            self._tick_id = self.add_tick_callback(self._on_tick)
+
+    def _on_tick(self, widget, frame_clock):
+        """Apply worker updates and the elapsed time once per frame."""
+        # However often the worker reports, widgets change at most once a frame
+        pending_step = self._pending_step
+        if pending_step is not None:
+            self._pending_step = None
+            self._update_step_info(*pending_step)
+        pending_progress = self._pending_progress
+        if pending_progress is not None:
+            self._pending_progress = None
+            self._update_progress(pending_progress)
+        if self._progress_animating:
+            self._progress_animating = self._animate_progress()
+        if self._scroll_pending:
+            self._scroll_pending = False
+            self._scroll_to_bottom()
+
+        if self.state == InstallationState.RUNNING and self._start_frame_time is not None:
+            elapsed = (frame_clock.get_frame_time() - self._start_frame_time) // 1_000_000
+            if elapsed == self._last_sec:
+                return GLib.SOURCE_CONTINUE
+            self._last_sec = elapsed
             minutes = elapsed // 60
             seconds = elapsed % 60
-            localization_manager = get_localization_manager()
-            self.time_label.set_text(f"{localization_manager.get_text('Elapsed time')}: {minutes:02d}:{seconds:02d}")
-        
-        return True  # Continue timer
+            self.time_label.set_text(f"{self._elapsed_text}: {minutes:02d}:{seconds:02d}")
+        elif (not self._progress_animating and self._pending_step is None
+              and self._pending_progress is None):
+            # Complete, failed or cancelled and the progress bar has settled.
+            # A tick callback keeps the frame clock running at the display
+            # rate, so drop it until the next installation or terminal flush.
+            self._tick_id = 0
+            return GLib.SOURCE_REMOVE
+        
+        return GLib.SOURCE_CONTINUE
     
     def _on_toggle_details(self, button):
         """Toggle the details view."""
         localization_manager = get_localization_manager()
         self.show_details = not self.show_details
+        if self.terminal_view is None:
+            self._build_terminal()
         self.details_revealer.set_reveal_child(self.show_details)
         self.toggle_details_btn.set_label(
             localization_manager.get_text("Hide Details") if self.show_details 
@@ -1553,6 +2128,8 @@ class InstallationWidget(Gtk.Box):
         """Handle cancel confirmation."""
         if response == "stop":
             self.should_cancel = True
+            # Don't wait for the running step to print or finish
+            self._interrupt_shell()
             self.btn_cancel.set_sensitive(False)
             localization_manager = get_localization_manager()
             self.operation_label.set_markup(f'<b>{localization_manager.get_text("Cancelling installation...")}</b>')
@@ -1612,6 +2189,7 @@ class InstallationWidget(Gtk.Box):
         self.operation_label.set_markup(f'<b>{localization_manager.get_text("An error occurred during installation")}</b>')
         self.step_description.set_text(error_msg)
 
+        self._stop_flatpak_prefetch()
         self._cleanup_mounts_async()
 
         self.btn_cancel.set_visible(False)
@@ -1646,7 +2224,7 @@ class InstallationWidget(Gtk.Box):
         self.operation_label.set_markup(f'<b>{localization_manager.get_text("Installation was cancelled by user")}</b>')
         self.step_description.set_text(localization_manager.get_text("The installation process was interrupted."))
 
-
+        self._stop_flatpak_prefetch()
         self._cleanup_mounts_async()
 
         # Keep a Close button visible so the user has a clear way out.
@@ -1662,6 +2240,28 @@ class InstallationWidget(Gtk.Box):
 
         return False
 
+    def _stop_flatpak_prefetch(self):
+        """Kill a background Flatpak download that is still running.
+
+        It runs as root, outside the step's process group, so cancelling
+        the step doesn't reach it. The lock tells a running download from a
+        finished one whose PID may since have been reused.
+        """
+        try:
+            with open(FLATPAK_PREFETCH_PID) as f:
+                pgid = int(f.read().strip())
+        except (OSError, ValueError):
+            return
+        try:
+            subprocess.run(
+                ["sudo", "bash", "-c",
+                 f"flock -n {FLATPAK_PREFETCH_LOCK} true || kill -TERM -- -{pgid}"],
+                capture_output=True,
+                timeout=10,
+            )
+        except Exception as e:
+            print(f"Could not stop the Flatpak download: {e}")
+
     def _cleanup_mounts_async(self):
         """Tear down installer mounts on a background thread.
 
@@ -1671,6 +2271,17 @@ class InstallationWidget(Gtk.Box):
         lazy-unmount fallback).
         """
         def _run():
+            # A killed Flatpak download may still be writing into the target
+            if os.path.exists(FLATPAK_PREFETCH_PID):
+                try:
+                    subprocess.run(
+                        ["sudo", "flock", "-w", "10", FLATPAK_PREFETCH_LOCK, "true"],
+                        capture_output=True,
+                        timeout=15,
+                    )
+                except Exception as e:
+                    print(f"Flatpak download still running: {e}")
+
             mount_points = (
                 "/tmp/linexin_installer/root",
                 "/tmp/linexin_installer/rootfs",
@@ -1685,7 +2296,7 @@ class InstallationWidget(Gtk.Box):
                         timeout=15,
                     )
                     if result.returncode != 0:
-                        # Busy mount (e.g. a lingering arch-chroot); fall
+                        # Busy mount (e.g. a process still running in the chroot); fall
                         # back to a lazy unmount so the kernel drops the
                         # mount once no process holds it anymore.
                         subprocess.run(
@@ -1702,13 +2313,13 @@ class InstallationWidget(Gtk.Box):
     
     def get_installation_log(self) -> List[str]:
         """Get the complete installation log."""
-        return self.log_buffer.copy()
+        return list(self.log_buffer)
     
     def save_log_to_file(self, filepath: str):
         """Save the installation log to a file."""
         try:
             with open(filepath, 'w') as f:
-                f.write('\n'.join(self.log_buffer))
+                f.writelines(line + '\n' for line in self.log_buffer)
             return True
         except Exception as e:
             print(f"Error saving log: {e}")
@@ -8,15 +8,16 @@ import xml.etree.ElementTree as ET
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, Gdk
+from gi.repository import Gtk, Adw, Gdk, Gio, GLib
 from simple_localization_manager import get_localization_manager
 
 # --- Localization Setup ---
 APP_NAME = "linexin-installer"
 LOCALE_DIR = os.path.abspath("/usr/share/locale")
 
-# Set initial language (will default to system language if not specified)
-locale.setlocale(locale.LC_ALL, '')
+# The installer entry point calls setlocale() once for the whole process;
+# doing it again at import would re-read the environment and could raise
+# locale.Error for an unsupported LANG before the app is even up.
 locale.bindtextdomain(APP_NAME, LOCALE_DIR)
 gettext.textdomain(APP_NAME)
 _ = gettext.gettext
@@ -32,6 +33,71 @@ XKB_RULES_FILES = [
 # systemd's table mapping console keymaps <-> xkb layout/variant. Used to pick a
 # sensible /etc/vconsole.conf KEYMAP for the TTY from the chosen xkb layout.
 KBD_MODEL_MAP = "/usr/share/systemd/kbd-model-map"
+# GNOME's input sources, set in-process for the live layout preview
+INPUT_SOURCES_SCHEMA = "org.gnome.desktop.input-sources"
+# How long a row must stay selected before the live session switches to it
+LIVE_PREVIEW_DELAY_MS = 200
+
+# Output of 'localectl list-keymaps', loaded on first use and shared by every
+# widget instance (the set of installed keymaps doesn't change while we run)
+_CONSOLE_KEYMAPS = None
+
+# A-Z -> the regional indicator symbols that pair up into flag emoji
+_REGIONAL_INDICATORS = str.maketrans({
+    chr(c): chr(c - ord('A') + 0x1F1E6) for c in range(ord('A'), ord('Z') + 1)
+})
+
+# Button styling, installed on the display once per process
+_CSS_DATA = b"""
+    .back_button {
+        border-radius: 20px;
+        font-weight: bold;
+        font-size: 1em;
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+        text-shadow: 0 1px 2px rgba(0,0,0,0.1);
+    }
+
+    .back_button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 15px alpha(@theme_bg_color, 0.3);
+    }
+
+    .back_button:active {
+        transform: translateY(0px);
+    }
+
+    .continue_button {
+        border-radius: 20px;
+        font-weight: bold;
+        font-size: 1em;
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+        text-shadow: 0 1px 2px rgba(0,0,0,0.1);
+    }
+
+    .continue_button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 15px alpha(@accent_color, 0.3);
+    }
+
+    .continue_button:active {
+        transform: translateY(0px);
+    }
+
+    @keyframes pulse {
+        0% { transform: scale(1); }
+        50% { transform: scale(1.05); }
+        100% { transform: scale(1); }
+    }
+
+    .pulse-animation {
+        animation: pulse 2s ease-in-out infinite;
+    }
+"""
+_CSS_INSTALLED = False
+
+# Parsed xkb layouts and kbd-model-map tables, likewise read once per process
+_XKB_LAYOUTS = None
+_KEYMAP_TABLES = None
 
 
 class KeyboardLayoutWidget(Gtk.Box):
@@ -55,6 +121,11 @@ class KeyboardLayoutWidget(Gtk.Box):
         # Setup CSS
         self.setup_css()
 
+        # Gio.Settings for INPUT_SOURCES_SCHEMA, created on the first preview
+        self._input_sources = None
+        # Pending live preview, applied once the selection settles
+        self._live_apply_id = 0
+
         # A list to hold the top-level expander rows for filtering
         self.expander_rows = []
         self.selected_row = None
@@ -143,7 +214,6 @@ class KeyboardLayoutWidget(Gtk.Box):
 
         # Console keymap lookup table for deriving vconsole.conf's KEYMAP.
         self._keymap_exact, self._keymap_base = self._load_console_keymap_map()
-        self._console_keymaps = self._load_console_keymaps()
 
         # --- Initial Population and Text ---
         self.populate_layouts()
@@ -153,18 +223,22 @@ class KeyboardLayoutWidget(Gtk.Box):
         if not country_code or len(country_code) != 2:
             return "" # Return empty string for invalid codes
 
-        return "".join(chr(ord(char) - ord('A') + 0x1F1E6) for char in country_code.upper())
+        return country_code.upper().translate(_REGIONAL_INDICATORS)
 
     def _load_console_keymaps(self):
         """Return the set of console keymaps known to this system."""
-        try:
-            result = subprocess.run(
-                ['localectl', 'list-keymaps'],
-                capture_output=True, text=True, check=True
-            )
-            return set(result.stdout.split())
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return set()
+        global _CONSOLE_KEYMAPS
+        if _CONSOLE_KEYMAPS is None:
+            try:
+                result = subprocess.run(
+                    ['localectl', 'list-keymaps'],
+                    capture_output=True, check=True
+                )
+                # Keymap names are plain ASCII; don't depend on the locale codec
+                _CONSOLE_KEYMAPS = frozenset(result.stdout.decode('ascii', 'replace').split())
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                _CONSOLE_KEYMAPS = frozenset()
+        return _CONSOLE_KEYMAPS
 
     def _load_console_keymap_map(self):
         """Parse systemd's kbd-model-map into reverse lookup tables.
@@ -173,7 +247,11 @@ class KeyboardLayoutWidget(Gtk.Box):
           exact[(xkb_layout, xkb_variant)] -> console keymap
           base[xkb_layout]                 -> console keymap (variant-less rows)
         """
+        global _KEYMAP_TABLES
+        if _KEYMAP_TABLES is not None:
+            return _KEYMAP_TABLES
         exact, base = {}, {}
+        _KEYMAP_TABLES = exact, base
         if not os.path.exists(KBD_MODEL_MAP):
             return exact, base
         try:
@@ -202,7 +280,9 @@ class KeyboardLayoutWidget(Gtk.Box):
         if keymap:
             return keymap
         # Many layouts share their name with a console keymap (de, fr, pl, ...).
-        if not self._console_keymaps or layout in self._console_keymaps:
+        # Only this fallback needs the keymap list, so localectl runs lazily.
+        console_keymaps = self._load_console_keymaps()
+        if not console_keymaps or layout in console_keymaps:
             return layout
         return 'us'
 
@@ -212,7 +292,15 @@ class KeyboardLayoutWidget(Gtk.Box):
         Returns a list of dicts sorted by display name:
           {'code', 'description', 'country', 'variants': [{'code', 'description'}]}
         The first variant entry (code '') represents the plain layout itself.
+        The result is parsed once and shared; callers must not modify it.
         """
+        global _XKB_LAYOUTS
+        if _XKB_LAYOUTS is None:
+            _XKB_LAYOUTS = self._parse_xkb_layouts()
+        return _XKB_LAYOUTS
+
+    def _parse_xkb_layouts(self):
+        """Read the layouts and variants out of the first xkb rules file found."""
         path = next((p for p in XKB_RULES_FILES if os.path.exists(p)), None)
         if not path:
             return []
@@ -296,33 +384,61 @@ class KeyboardLayoutWidget(Gtk.Box):
             expander = Adw.ExpanderRow(title=f"{flag} {layout['description']}")
             self.list_box.append(expander)
 
-            nested_list_box = Gtk.ListBox()
-            nested_list_box.get_style_context().add_class("boxed-list")
-            nested_list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-            nested_list_box.connect("row-selected", self.on_row_selected)
-            expander.add_row(nested_list_box)
-
+            # Variant rows are built the first time the group is opened or
+            # matched by a search; most groups are never looked at.
+            expander.layout = layout
             expander.child_rows = []
-            for variant in layout['variants']:
-                row = Gtk.ListBoxRow()
-                label = Gtk.Label(label=variant['description'], xalign=0,
-                                  margin_start=20, margin_top=6, margin_bottom=6)
-                row.set_child(label)
-                row.xkb_layout = layout['code']
-                row.xkb_variant = variant['code']
-                # Search matches the readable name plus the raw codes/country.
-                row.search_term = " ".join(filter(None, [
-                    variant['description'].lower(),
-                    layout['description'].lower(),
-                    layout['code'].lower(),
-                    variant['code'].lower(),
-                    layout['country'].lower(),
-                ]))
-                nested_list_box.append(row)
-                expander.child_rows.append(row)
+            expander.connect("notify::expanded", self._on_expander_expanded)
 
+            # Lets the filter rule out a whole group with one substring test
+            expander.search_text = "\n".join(
+                self._variant_search_term(layout, variant) for variant in layout['variants'])
             self.expander_rows.append(expander)
 
+    def _variant_search_term(self, layout, variant):
+        """Search matches the readable name plus the raw codes/country."""
+        return " ".join(filter(None, [
+            variant['description'].lower(),
+            layout['description'].lower(),
+            layout['code'].lower(),
+            variant['code'].lower(),
+            layout['country'].lower(),
+        ]))
+
+    def _on_expander_expanded(self, expander, _pspec):
+        """Build a group's rows when it is opened for the first time."""
+        if expander.get_expanded():
+            self._build_variant_rows(expander)
+
+    def _build_variant_rows(self, expander):
+        """Create a layout group's variant rows, once."""
+        if expander.child_rows:
+            return
+        layout = expander.layout
+
+        nested_list_box = Gtk.ListBox()
+        nested_list_box.get_style_context().add_class("boxed-list")
+        nested_list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
+        nested_list_box.connect("row-selected", self.on_row_selected)
+        expander.add_row(nested_list_box)
+
+        for variant in layout['variants']:
+            row = Gtk.ListBoxRow()
+            label = Gtk.Label(label=variant['description'], xalign=0,
+                              margin_start=20, margin_top=6, margin_bottom=6)
+            row.set_child(label)
+            row.xkb_layout = layout['code']
+            row.xkb_variant = variant['code']
+            row.search_term = self._variant_search_term(layout, variant)
+            nested_list_box.append(row)
+            expander.child_rows.append(row)
+
+    def _apply_live_layout(self, layout, variant):
+        """Timeout callback: preview the layout the selection settled on."""
+        self._live_apply_id = 0
+        self._set_keyboard_layout_live(layout, variant)
+        return GLib.SOURCE_REMOVE
+
     def _set_keyboard_layout_live(self, layout, variant):
         """
         Sets the keyboard layout for the CURRENT GRAPHICAL SESSION ONLY.
@@ -332,78 +448,71 @@ class KeyboardLayoutWidget(Gtk.Box):
 
         source = f"{layout}+{variant}" if variant else layout
         print(f"Attempting to set live session keyboard layout to: {source}")
+        if self._input_sources is None:
+            # Same setting 'gsettings set' would change, without a fork+exec
+            # per selection. Missing on non-GNOME desktops.
+            schema_source = Gio.SettingsSchemaSource.get_default()
+            if schema_source is None or schema_source.lookup(INPUT_SOURCES_SCHEMA, True) is None:
+                print(f"Info: {INPUT_SOURCES_SCHEMA} is not installed, live layout preview unavailable "
+                      "(expected on non-GNOME desktops).")
+                return
+            self._input_sources = Gio.Settings.new(INPUT_SOURCES_SCHEMA)
         try:
-            # This gsettings command works for GNOME and some other desktops.
-            gsettings_value = f"[('xkb', '{source}')]"
-            subprocess.run(
-                ['gsettings', 'set', 'org.gnome.desktop.input-sources', 'sources', gsettings_value],
-                check=True, capture_output=True, text=True
-            )
+            self._input_sources.set_value("sources", GLib.Variant("a(ss)", [("xkb", source)]))
             print(f"Successfully set live session keyboard layout to {source}")
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"Info: Could not set live layout using gsettings (expected on non-GNOME desktops). Error: {e}")
+        except GLib.Error as e:
+            print(f"Info: Could not set live layout. Error: {e}")
 
-    def save_vconsole_config(self):
-        """Save the selected keyboard layout to /tmp/installer_config/etc/vconsole.conf"""
+    def save_keyboard_config(self):
+        """Write the keyboard configuration for the selected layout to /tmp/installer_config.
+
+        Creates etc/vconsole.conf (console keymap), the X11/Wayland
+        etc/X11/xorg.conf.d/00-keyboard.conf and the setup_keyboard.sh script
+        the installer runs in the chroot, all in one pass.
+        """
         if not self.selected_layout:
             return False
 
+        layout = self.selected_layout
+        variant = self.selected_variant or ""
         try:
-            keymap = self._derive_console_keymap(self.selected_layout, self.selected_variant or "")
+            keymap = self._derive_console_keymap(layout, variant)
 
-            # Create directory structure in /tmp/installer_config/etc/
-            etc_dir = "/tmp/installer_config/etc"
-            os.makedirs(etc_dir, exist_ok=True)
+            # The deepest directory first; it creates the other two on the way
+            installer_dir = "/tmp/installer_config"
+            etc_dir = os.path.join(installer_dir, "etc")
+            x11_dir = os.path.join(etc_dir, "X11", "xorg.conf.d")
+            os.makedirs(x11_dir, exist_ok=True)
 
             # KEYMAP is the console keyboard layout; FONT is a reasonable default.
-            vconsole_content = [
-                f"KEYMAP={keymap}",
-                "FONT=ter-v16n",  # Terminus font, good for console
-                "FONT_MAP="
-            ]
-
             vconsole_path = os.path.join(etc_dir, "vconsole.conf")
-            with open(vconsole_path, 'w') as f:
-                f.write('\n'.join(vconsole_content) + '\n')
-
+            self._write_file(vconsole_path,
+                             f"KEYMAP={keymap}\n"
+                             "FONT=ter-v16n\n"  # Terminus font, good for console
+                             "FONT_MAP=\n")
             print(f"Console keyboard configuration saved to: {vconsole_path}")
 
-            # Also create X11 keyboard configuration for graphical environments
-            self.save_x11_keyboard_config(self.selected_layout, self.selected_variant or "")
-
-            return True
-
-        except Exception as e:
-            print(f"Error saving vconsole configuration: {e}")
-            return False
-
-
-    def save_x11_keyboard_config(self, layout, variant):
-        """Save X11/Wayland keyboard configuration for graphical environments."""
-        try:
-            # Create X11 config directory
-            x11_dir = "/tmp/installer_config/etc/X11/xorg.conf.d"
-            os.makedirs(x11_dir, exist_ok=True)
-
-            # Create 00-keyboard.conf for X11 using the real xkb layout/variant.
-            x11_config = f"""Section "InputClass"
+            # 00-keyboard.conf for X11 using the real xkb layout/variant.
+            x11_config_path = os.path.join(x11_dir, "00-keyboard.conf")
+            self._write_file(x11_config_path, f"""Section "InputClass"
     Identifier "system-keyboard"
     MatchIsKeyboard "on"
     Option "XkbLayout" "{layout}"
     Option "XkbVariant" "{variant}"
 EndSection
-"""
-
-            x11_config_path = os.path.join(x11_dir, "00-keyboard.conf")
-            with open(x11_config_path, 'w') as f:
-                f.write(x11_config)
-
+""")
             print(f"X11 keyboard configuration saved to: {x11_config_path}")
 
+            script_path = os.path.join(installer_dir, "setup_keyboard.sh")
+            self._write_file(script_path, self._keyboard_install_script(layout, variant, keymap), 0o755)
+            print(f"Keyboard setup script created at: {script_path}")
+
+            print(f"Keyboard configuration saved for layout: {layout} "
+                  f"variant: {variant} keymap: {keymap}")
             return True
 
         except Exception as e:
-            print(f"Error saving X11 keyboard configuration: {e}")
+            print(f"Error saving keyboard configuration: {e}")
             return False
 
     def on_search_changed(self, entry):
@@ -411,6 +520,18 @@ EndSection
         search_text = entry.get_text().lower()
 
         for expander in self.expander_rows:
+            if search_text not in expander.search_text:
+                expander.set_visible(False)
+                continue
+
+            if not search_text:
+                # Cleared search: show everything without building new rows
+                expander.set_visible(True)
+                for row in expander.child_rows:
+                    row.set_visible(True)
+                continue
+
+            self._build_variant_rows(expander)
             visible_children = 0
             for row in expander.child_rows:
                 is_visible = search_text in row.search_term
@@ -423,7 +544,10 @@ EndSection
                 expander.set_expanded(visible_children > 0)
 
     def on_row_selected(self, listbox, row):
-        """Save keyboard config and update the live preview when a layout is selected."""
+        """Remember the selected layout and update the live preview.
+
+        The config files are written once, by save_keyboard_config on Continue.
+        """
         if self.selected_row and self.selected_row != row:
             if self.selected_row.get_parent() != listbox:
                 self.selected_row.get_parent().unselect_row(self.selected_row)
@@ -431,30 +555,38 @@ EndSection
         self.selected_row = row
         self.btn_proceed.set_sensitive(row is not None)
 
+        # Arrow-keying through the list only previews the row it stops on
+        if self._live_apply_id:
+            GLib.source_remove(self._live_apply_id)
+            self._live_apply_id = 0
+
         if row:
             self.selected_layout = row.xkb_layout
             self.selected_variant = row.xkb_variant
-            self._set_keyboard_layout_live(row.xkb_layout, row.xkb_variant)
+            self._live_apply_id = GLib.timeout_add(
+                LIVE_PREVIEW_DELAY_MS, self._apply_live_layout, row.xkb_layout, row.xkb_variant)
             self.test_entry.grab_focus()
-            # Save keyboard configuration when a layout is selected
-            self.save_vconsole_config()
         else:
             self.selected_layout = None
             self.selected_variant = None
 
 
-    def create_keyboard_install_script(self, layout, variant, keymap):
-        """Create a script the installer runs (in chroot) to set up the keyboard."""
+    def _write_file(self, path, text, mode=0o644):
+        """Replace path with text in one unbuffered write (the files are tiny)."""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
         try:
-            installer_dir = "/tmp/installer_config"
-            os.makedirs(installer_dir, exist_ok=True)
-
-            script_path = os.path.join(installer_dir, "setup_keyboard.sh")
-
-            # Runs inside the freshly installed system. The config files were
-            # already copied in, but we (re)write them here so the script is
-            # self-sufficient, then let localed record the setting if available.
-            script_content = f"""#!/bin/bash
+            # O_CREAT's mode is ignored for an existing file and masked by umask
+            os.fchmod(fd, mode)
+            os.write(fd, text.encode())
+        finally:
+            os.close(fd)
+
+    def _keyboard_install_script(self, layout, variant, keymap):
+        """Return the script the installer runs (in chroot) to set up the keyboard."""
+        # Runs inside the freshly installed system. The config files were
+        # already copied in, but we (re)write them here so the script is
+        # self-sufficient, then let localed record the setting if available.
+        return f"""#!/bin/bash
 # Keyboard layout setup script generated by Linexin Installer
 # xkb layout: {layout}  variant: {variant}  console keymap: {keymap}
 
@@ -488,29 +620,10 @@ fi
 echo "Keyboard layout configured: layout=$XKB_LAYOUT variant=$XKB_VARIANT keymap=$KEYMAP"
 """
 
-            with open(script_path, 'w') as f:
-                f.write(script_content)
-
-            os.chmod(script_path, 0o755)
-
-            print(f"Keyboard setup script created at: {script_path}")
-            return True
-
-        except Exception as e:
-            print(f"Error creating keyboard setup script: {e}")
-            return False
-
 
     def on_continue_clicked(self, button):
         """Handle the Continue button click"""
-        if self.save_vconsole_config():
-            keymap = self._derive_console_keymap(self.selected_layout, self.selected_variant or "")
-            print(f"Keyboard configuration saved for layout: {self.selected_layout} "
-                  f"variant: {self.selected_variant} keymap: {keymap}")
-            # Also create the installation script
-            self.create_keyboard_install_script(
-                self.selected_layout, self.selected_variant or "", keymap)
-        else:
+        if not self.save_keyboard_config():
             print("Failed to save keyboard configuration")
 
     def get_vconsole_config_path(self):
@@ -527,61 +640,18 @@ echo "Keyboard layout configured: layout=$XKB_LAYOUT variant=$XKB_VARIANT keymap
 
     def setup_css(self):
         """Setup CSS styling for buttons"""
+        global _CSS_INSTALLED
+        if _CSS_INSTALLED:
+            return
+        display = Gdk.Display.get_default()
+        if not display:
+            # No display yet; a later instance will install the provider
+            return
         css_provider = Gtk.CssProvider()
-        css_data = """
-        .back_button {
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
-        }
-
-        .back_button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px alpha(@theme_bg_color, 0.3);
-        }
-
-        .back_button:active {
-            transform: translateY(0px);
-        }
-
-        .continue_button {
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
-        }
-
-        .continue_button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px alpha(@accent_color, 0.3);
-        }
-
-        .continue_button:active {
-            transform: translateY(0px);
-        }
-
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-
-        .pulse-animation {
-            animation: pulse 2s ease-in-out infinite;
-        }
-        """
-        css_provider.load_from_data(css_data.encode())
-        # Use Gdk.Display.get_default() via import or context
-        display = Gtk.Widget.get_display(self) if hasattr(self, 'get_display') else Gdk.Display.get_default()
-        if display:
-             Gtk.StyleContext.add_provider_for_display(
-                display,
-                css_provider,
-                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-            )
-        else:
-             # Fallback if display not yet available (rare in init but possible)
-             pass
+        css_provider.load_from_data(_CSS_DATA)
+        Gtk.StyleContext.add_provider_for_display(
+            display,
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
+        _CSS_INSTALLED = True
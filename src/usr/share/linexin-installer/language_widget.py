@@ -1,17 +1,21 @@
 #!/usr/bin/env python3
 
+import os
 import gi
 import locale
+import subprocess
 import gettext
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, Gdk
+from gi.repository import Gtk, Adw, Gdk, GLib
 from simple_localization_manager import get_localization_manager
 
 # --- Localization Setup ---
 APP_NAME = "linexin-installer"
 LOCALE_DIR = "/usr/share/locale"
+# How long a row must stay selected before its language script is written
+SCRIPT_WRITE_DELAY_MS = 150
 
 # Set initial language (will default to system language if not specified)
 try:
@@ -19,294 +23,121 @@ try:
 except locale.Error:
     pass
 
-locale.bindtextdomain(APP_NAME, LOCALE_DIR)
-gettext.textdomain(APP_NAME)
-_ = gettext.gettext
-
-class LanguageWidget(Gtk.Box):
-
-    def setup_css(self):
-        """Setup CSS styling for buttons"""
-        css_provider = Gtk.CssProvider()
-        css_data = """
-        .back_button {
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
-        }
-        
-        .back_button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px alpha(@theme_bg_color, 0.3);
-        }
-        
-        .back_button:active {
-            transform: translateY(0px);
-        }
-
-        .continue_button {
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
-        }
-        
-        .continue_button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px alpha(@accent_color, 0.3);
-        }
-        
-        .continue_button:active {
-            transform: translateY(0px);
-        }
-        
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-        
-        .pulse-animation {
-            animation: pulse 2s ease-in-out infinite;
-        }
-        """
-        css_provider.load_from_data(css_data.encode())
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(),
-            css_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        get_localization_manager().register_widget(self)
-        self.set_orientation(Gtk.Orientation.VERTICAL)
-        self.set_spacing(20)
-        self.set_margin_top(15)
-        self.set_margin_bottom(15)
- 
-        # Setup CSS
-        self.setup_css()
-        
-        # A list to hold the language row widgets for easy filtering        
-        # A list to hold the language row widgets for easy filtering
-        self.language_rows = []
-
-        # --- UI Elements ---
-
-        # Main title label
-        title = Gtk.Label()
-        title.set_markup("<span size='xx-large' weight='bold'>" + _("Select a Language") + "</span>")
-        title.set_halign(Gtk.Align.CENTER)
-        self.append(title)
-
-        # --- Adw.Clamp constrains the width of the content ---
-        clamp = Adw.Clamp(margin_start=12, margin_end=12, maximum_size=600)
-        clamp.set_vexpand(True)
-        self.append(clamp)
-
-        # A content box to hold the search and list inside the clamp
-        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        clamp.set_child(content_box)
-
-        # --- Subtitle Label ---
-        self.subtitle = Gtk.Label(
-            label=_("Select the language you want to use for the system."),
-            halign=Gtk.Align.CENTER
-        )
-        self.subtitle.add_css_class('dim-label')
-        content_box.append(self.subtitle)
-
-        # Search entry to filter languages
-        self.search_entry = Gtk.SearchEntry()
-        self.search_entry.set_placeholder_text(_("Search for a language..."))
-        self.search_entry.connect("search-changed", self.on_search_changed)
-        content_box.append(self.search_entry)
-
-        # ScrolledWindow to contain the list of languages
-        scrolled_window = Gtk.ScrolledWindow()
-        scrolled_window.set_has_frame(True)
-        scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scrolled_window.set_vexpand(True)
-        content_box.append(scrolled_window)
-
-        # ListBox to display each language
-        self.list_box = Gtk.ListBox()
-        self.list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.list_box.get_style_context().add_class("boxed-list")
-        scrolled_window.set_child(self.list_box)
-
-        # Populate the list with available languages
-        self.populate_languages()
-
-        # Action bar at the bottom for navigation buttons
-        action_bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
-        action_bar.set_halign(Gtk.Align.CENTER)
-        self.append(action_bar)
-
-        # The "Back" button
-        self.btn_back = Gtk.Button(label="Back")
-        self.btn_back.add_css_class("back_button")
-        self.btn_back.set_size_request(140, 50)
-        
-        # Add hover effects to back button
-        back_hover = Gtk.EventControllerMotion()
-        back_hover.connect("enter", lambda c, x, y: self.btn_back.add_css_class("pulse-animation"))
-        back_hover.connect("leave", lambda c: self.btn_back.remove_css_class("pulse-animation"))
-        self.btn_back.add_controller(back_hover)
-        
-        action_bar.append(self.btn_back)
-
-
-        # The "Proceed" button
-        self.btn_proceed = Gtk.Button(label="Continue")
-        self.btn_proceed.add_css_class("suggested-action")
-        self.btn_proceed.add_css_class("continue_button")
-        self.btn_proceed.set_size_request(140, 50)
-        self.btn_proceed.set_sensitive(False)
-        
-        # Add hover effects to continue button
-        continue_hover = Gtk.EventControllerMotion()
-        continue_hover.connect("enter", lambda c, x, y: self.btn_proceed.add_css_class("pulse-animation"))
-        continue_hover.connect("leave", lambda c: self.btn_proceed.remove_css_class("pulse-animation"))
-        self.btn_proceed.add_controller(continue_hover)
-        
-        action_bar.append(self.btn_proceed)
-
-        # Connect signal to enable the proceed button upon selection
-        self.list_box.connect("row-selected", self.on_row_selected)
-
-    def on_continue_clicked(self, button):
-        """Handle the Continue button click"""
-        if self.create_language_script():
-            print(f"Language script created for: {self.get_selected_language_code()}")
-            # You can add navigation to the next widget here
-        else:
-            print("Failed to create language script")
-
-    def country_code_to_emoji(self, country_code):
-        """Converts a two-letter country code to a flag emoji."""
-        # Formula to convert a two-letter country code to a flag emoji
-        # (e.g., 'US' -> '🇺🇸')
-        if len(country_code) != 2:
-            return "🏳️" # Return a white flag for invalid codes
-        
-        return "".join(chr(ord(char) - ord('A') + 0x1F1E6) for char in country_code.upper())
-
-    def populate_languages(self):
-        # A comprehensive list of languages.
-        languages = {
-            "af_ZA.UTF-8": "Afrikaans (Suid-Afrika)",
-            "sq_AL.UTF-8": "Shqip (Shqipëri)",
-            "ar_SA.UTF-8": "العربية (المملكة العربية السعودية)",
-            "be_BY.UTF-8": "Беларуская (Беларусь)",
-            "bs_BA.UTF-8": "Bosanski (Bosna i Hercegovina)",
-            "bg_BG.UTF-8": "Български (България)",
-            "ca_ES.UTF-8": "Català (Espanya)",
-            "zh_CN.UTF-8": "简体中文 (中国)",
-            "zh_TW.UTF-8": "繁體中文 (台灣)",
-            "hr_HR.UTF-8": "Hrvatski (Hrvatska)",
-            "cs_CZ.UTF-8": "Čeština (Česká republika)",
-            "da_DK.UTF-8": "Dansk (Danmark)",
-            "nl_NL.UTF-8": "Nederlands (Nederland)",
-            "en_US.UTF-8": "English (United States)",
-            "en_GB.UTF-8": "English (United Kingdom)",
-            "en_AU.UTF-8": "English (Australia)",
-            "en_CA.UTF-8": "English (Canada)",
-            "et_EE.UTF-8": "Eesti (Eesti)",
-            "fa_IR.UTF-8": "فارسی (ایران)",
-            "fil_PH.UTF-8": "Filipino (Pilipinas)",
-            "fi_FI.UTF-8": "Suomi (Suomi)",
-            "fr_FR.UTF-8": "Français (France)",
-            "fr_CA.UTF-8": "Français (Canada)",
-            "ga_IE.UTF-8": "Gaeilge (Éire)",
-            "gl_ES.UTF-8": "Galego (España)",
-            "ka_GE.UTF-8": "ქართული (საქართველო)",
-            "de_DE.UTF-8": "Deutsch (Deutschland)",
-            "el_GR.UTF-8": "Ελληνικά (Ελλάδα)",
-            "gu_IN.UTF-8": "ગુજરાતી (ભારત)",
-            "he_IL.UTF-8": "עברית (ישראל)",
-            "hi_IN.UTF-8": "हिन्दी (भारत)",
-            "hu_HU.UTF-8": "Magyar (Magyarország)",
-            "is_IS.UTF-8": "Íslenska (Ísland)",
-            "id_ID.UTF-8": "Bahasa Indonesia (Indonesia)",
-            "it_IT.UTF-8": "Italiano (Italia)",
-            "ja_JP.UTF-8": "日本語 (日本)",
-            "kn_IN.UTF-8": "ಕನ್ನಡ (ಭಾರತ)",
-            "km_KH.UTF-8": "ភាសាខ្មែរ (កម្ពុជា)",
-            "ko_KR.UTF-8": "한국어 (대한민국)",
-            "lo_LA.UTF-8": "ລາວ (ລາວ)",
-            "lt_LT.UTF-8": "Lietuvių (Lietuva)",
-            "lv_LV.UTF-8": "Latviešu (Latvija)",
-            "ml_IN.UTF-8": "മലയാളം (ഇന്ത്യ)",
-            "ms_MY.UTF-8": "Bahasa Melayu (Malaysia)",
-            "mi_NZ.UTF-8": "Te Reo Māori (Aotearoa)",
-            "mn_MN.UTF-8": "Монгол (Монгол)",
-            "no_NO.UTF-8": "Norsk bokmål (Norge)",
-            "nn_NO.UTF-8": "Norsk nynorsk (Noreg)",
-            "pl_PL.UTF-8": "Polski (Polska)",
-            "pt_PT.UTF-8": "Português (Portugal)",
-            "pt_BR.UTF-8": "Português (Brasil)",
-            "ro_RO.UTF-8": "Română (România)",
-            "ru_RU.UTF-8": "Русский (Россия)",
-            "sr_RS.UTF-8": "Српски (Србија)",
-            "sk_SK.UTF-8": "Slovenčina (Slovensko)",
-            "sl_SI.UTF-8": "Slovenščina (Slovenija)",
-            "so_SO.UTF-8": "Soomaali (Soomaaliya)",
-            "es_ES.UTF-8": "Español (España)",
-            "sv_SE.UTF-8": "Svenska (Sverige)",
-            "tl_PH.UTF-8": "Tagalog (Pilipinas)",
-            "ta_IN.UTF-8": "தமிழ் (இந்தியா)",
-            "th_TH.UTF-8": "ไทย (ประเทศไทย)",
-            "tr_TR.UTF-8": "Türkçe (Türkiye)",
-            "uk_UA.UTF-8": "Українська (Україна)",
-            "vi_VN.UTF-8": "Tiếng Việt (Việt Nam)",
-        }
-
-        # Sort languages alphabetically by name
-        for code, name in sorted(languages.items(), key=lambda item: item[1]):
-            # --- FIX: Use a simple Gtk.ListBoxRow with a Gtk.Label ---
-            row = Gtk.ListBoxRow()
-            
-            # --- FEATURE: Add flag emoji ---
-            country_code = code.split('_')[1].split('.')[0]
-            flag_emoji = self.country_code_to_emoji(country_code)
-            
-            label = Gtk.Label(label=f"{flag_emoji} {name}", xalign=0, margin_start=10, margin_end=10, margin_top=10, margin_bottom=10)
-            row.set_child(label)
-            
-            # Attach metadata to the row for later use
-            row.locale_code = code
-            row.search_term = name.lower() # Store a lowercase version for searching
-            
-            self.list_box.append(row)
-            self.language_rows.append(row)
-
-    def create_language_script(self):
-        """Create a bash script to configure the system language"""
-        selected_locale = self.get_selected_language_code()
-        if not selected_locale:
-            return False
-        
-        try:
-            import os
-            
-            # Create directory structure in /tmp/installer_config/
-            config_dir = "/tmp/installer_config"
-            os.makedirs(config_dir, exist_ok=True)
-            
-            # Create the bash script content
-            script_content = f'''#!/bin/bash
+# Look the catalog up once. gettext.gettext goes through dgettext(), which
+# searches LOCALE_DIR for a .mo file again on every call.
+_translation = gettext.translation(APP_NAME, LOCALE_DIR, fallback=True)
+_ = _translation.gettext
+
+# A comprehensive list of languages: locale -> native name
+LANGUAGES = {
+    "af_ZA.UTF-8": "Afrikaans (Suid-Afrika)",
+    "sq_AL.UTF-8": "Shqip (Shqipëri)",
+    "ar_SA.UTF-8": "العربية (المملكة العربية السعودية)",
+    "be_BY.UTF-8": "Беларуская (Беларусь)",
+    "bs_BA.UTF-8": "Bosanski (Bosna i Hercegovina)",
+    "bg_BG.UTF-8": "Български (България)",
+    "ca_ES.UTF-8": "Català (Espanya)",
+    "zh_CN.UTF-8": "简体中文 (中国)",
+    "zh_TW.UTF-8": "繁體中文 (台灣)",
+    "hr_HR.UTF-8": "Hrvatski (Hrvatska)",
+    "cs_CZ.UTF-8": "Čeština (Česká republika)",
+    "da_DK.UTF-8": "Dansk (Danmark)",
+    "nl_NL.UTF-8": "Nederlands (Nederland)",
+    "en_US.UTF-8": "English (United States)",
+    "en_GB.UTF-8": "English (United Kingdom)",
+    "en_AU.UTF-8": "English (Australia)",
+    "en_CA.UTF-8": "English (Canada)",
+    "et_EE.UTF-8": "Eesti (Eesti)",
+    "fa_IR.UTF-8": "فارسی (ایران)",
+    "fil_PH.UTF-8": "Filipino (Pilipinas)",
+    "fi_FI.UTF-8": "Suomi (Suomi)",
+    "fr_FR.UTF-8": "Français (France)",
+    "fr_CA.UTF-8": "Français (Canada)",
+    "ga_IE.UTF-8": "Gaeilge (Éire)",
+    "gl_ES.UTF-8": "Galego (España)",
+    "ka_GE.UTF-8": "ქართული (საქართველო)",
+    "de_DE.UTF-8": "Deutsch (Deutschland)",
+    "el_GR.UTF-8": "Ελληνικά (Ελλάδα)",
+    "gu_IN.UTF-8": "ગુજરાતી (ભારત)",
+    "he_IL.UTF-8": "עברית (ישראל)",
+    "hi_IN.UTF-8": "हिन्दी (भारत)",
+    "hu_HU.UTF-8": "Magyar (Magyarország)",
+    "is_IS.UTF-8": "Íslenska (Ísland)",
+    "id_ID.UTF-8": "Bahasa Indonesia (Indonesia)",
+    "it_IT.UTF-8": "Italiano (Italia)",
+    "ja_JP.UTF-8": "日本語 (日本)",
+    "kn_IN.UTF-8": "ಕನ್ನಡ (ಭಾರತ)",
+    "km_KH.UTF-8": "ភាសាខ្មែរ (កម្ពុជា)",
+    "ko_KR.UTF-8": "한국어 (대한민국)",
+    "lo_LA.UTF-8": "ລາວ (ລາວ)",
+    "lt_LT.UTF-8": "Lietuvių (Lietuva)",
+    "lv_LV.UTF-8": "Latviešu (Latvija)",
+    "ml_IN.UTF-8": "മലയാളം (ഇന്ത്യ)",
+    "ms_MY.UTF-8": "Bahasa Melayu (Malaysia)",
+    "mi_NZ.UTF-8": "Te Reo Māori (Aotearoa)",
+    "mn_MN.UTF-8": "Монгол (Монгол)",
+    "no_NO.UTF-8": "Norsk bokmål (Norge)",
+    "nn_NO.UTF-8": "Norsk nynorsk (Noreg)",
+    "pl_PL.UTF-8": "Polski (Polska)",
+    "pt_PT.UTF-8": "Português (Portugal)",
+    "pt_BR.UTF-8": "Português (Brasil)",
+    "ro_RO.UTF-8": "Română (România)",
+    "ru_RU.UTF-8": "Русский (Россия)",
+    "sr_RS.UTF-8": "Српски (Србија)",
+    "sk_SK.UTF-8": "Slovenčina (Slovensko)",
+    "sl_SI.UTF-8": "Slovenščina (Slovenija)",
+    "so_SO.UTF-8": "Soomaali (Soomaaliya)",
+    "es_ES.UTF-8": "Español (España)",
+    "sv_SE.UTF-8": "Svenska (Sverige)",
+    "tl_PH.UTF-8": "Tagalog (Pilipinas)",
+    "ta_IN.UTF-8": "தமிழ் (இந்தியா)",
+    "th_TH.UTF-8": "ไทย (ประเทศไทย)",
+    "tr_TR.UTF-8": "Türkçe (Türkiye)",
+    "uk_UA.UTF-8": "Українська (Україна)",
+    "vi_VN.UTF-8": "Tiếng Việt (Việt Nam)",
+}
+
+# A-Z -> the regional indicator symbols that pair up into flag emoji
+_REGIONAL_INDICATORS = str.maketrans({
+    chr(c): chr(c - ord('A') + 0x1F1E6) for c in range(ord('A'), ord('Z') + 1)
+})
+
+
+def _country_code_to_emoji(country_code):
+    """Converts a two-letter country code to a flag emoji (e.g., 'US' -> '🇺🇸')."""
+    if len(country_code) != 2:
+        return "🏳️" # Return a white flag for invalid codes
+    return country_code.upper().translate(_REGIONAL_INDICATORS)
+
+
+def _build_language_table():
+    """
+    Build the rows of the language list once: (locale, label, search term),
+    sorted alphabetically by name. The list is fixed, so every widget instance
+    shares the result instead of redoing the flag and lowercase work.
+    """
+    table = []
+    for code, name in sorted(LANGUAGES.items(), key=lambda item: item[1]):
+        country_code = code.split('_')[1].split('.')[0]
+        flag_emoji = _country_code_to_emoji(country_code)
+        table.append((code, f"{flag_emoji} {name}", name.lower()))
+    return tuple(table)
+
+
+_LANGUAGES = _build_language_table()
+# Lowercase search term per locale, for the search filter
+_SEARCH_TERMS = {code: search_term for code, _label, search_term in _LANGUAGES}
+
+# Bash script that configures the system locale inside the chroot. Only
+# {locale} is substituted; literal shell braces are doubled for str.format.
+LANGUAGE_SCRIPT_TEMPLATE = '''#!/bin/bash
 # Language configuration script generated by installer
-# This script configures the system locale to {selected_locale}
+# This script configures the system locale to {locale}
 # Designed to run in arch-chroot environment as root
 
 set -e  # Exit on any error
 
-echo "Configuring system locale to {selected_locale}..."
+echo "Configuring system locale to {locale}..."
 echo "Running in arch-chroot environment as root"
 
 # Backup existing configurations
@@ -331,7 +162,7 @@ generate_locale_gen() {{
 # Locale configuration generated by installer
 # Always include en_US.UTF-8 as fallback
 en_US.UTF-8 UTF-8
-{selected_locale} UTF-8
+{locale} UTF-8
 EOL
     echo "✓ /etc/locale.gen created"
 }}
@@ -340,19 +171,19 @@ EOL
 generate_locale_conf() {{
     echo "Generating /etc/locale.conf..."
     cat > /etc/locale.conf << 'EOL'
-LANG={selected_locale}
-LC_ADDRESS={selected_locale}
-LC_IDENTIFICATION={selected_locale}
-LC_MEASUREMENT={selected_locale}
-LC_MONETARY={selected_locale}
-LC_NAME={selected_locale}
-LC_NUMERIC={selected_locale}
-LC_PAPER={selected_locale}
-LC_TELEPHONE={selected_locale}
-LC_TIME={selected_locale}
-LC_COLLATE={selected_locale}
-LC_CTYPE={selected_locale}
-LC_MESSAGES={selected_locale}
+LANG={locale}
+LC_ADDRESS={locale}
+LC_IDENTIFICATION={locale}
+LC_MEASUREMENT={locale}
+LC_MONETARY={locale}
+LC_NAME={locale}
+LC_NUMERIC={locale}
+LC_PAPER={locale}
+LC_TELEPHONE={locale}
+LC_TIME={locale}
+LC_COLLATE={locale}
+LC_CTYPE={locale}
+LC_MESSAGES={locale}
 EOL
     echo "✓ /etc/locale.conf created"
 }}
@@ -374,7 +205,7 @@ create_systemd_locale() {{
     mkdir -p /etc/systemd/system.conf.d
     cat > /etc/systemd/system.conf.d/10-locale.conf << 'EOL'
 [Manager]
-DefaultEnvironment="LANG={selected_locale}" "LC_ALL={selected_locale}"
+DefaultEnvironment="LANG={locale}" "LC_ALL={locale}"
 EOL
     echo "✓ Systemd locale configuration created"
 }}
@@ -385,8 +216,8 @@ setup_default_environment() {{
     
     # Create /etc/environment for system-wide locale
     cat > /etc/environment << 'EOL'
-LANG={selected_locale}
-LC_ALL={selected_locale}
+LANG={locale}
+LC_ALL={locale}
 EOL
     echo "✓ /etc/environment created"
     
@@ -398,8 +229,8 @@ EOL
         cat >> /etc/skel/.bashrc << 'EOL'
 
 # Locale configuration
-export LANG={selected_locale}
-export LC_ALL={selected_locale}
+export LANG={locale}
+export LC_ALL={locale}
 EOL
         echo "✓ Default .bashrc updated with locale"
     fi
@@ -409,8 +240,8 @@ EOL
         cat >> /etc/skel/.profile << 'EOL'
 
 # Locale configuration
-export LANG={selected_locale}
-export LC_ALL={selected_locale}
+export LANG={locale}
+export LC_ALL={locale}
 EOL
         echo "✓ Default .profile updated with locale"
     fi
@@ -438,8 +269,8 @@ update_existing_users() {{
                 cat >> "$user_home/.bashrc" << 'EOL'
 
 # Locale configuration (updated by installer)
-export LANG={selected_locale}
-export LC_ALL={selected_locale}
+export LANG={locale}
+export LC_ALL={locale}
 EOL
                 echo "  ✓ Updated $user_home/.bashrc"
             fi
@@ -454,8 +285,8 @@ EOL
                 cat >> "$user_home/.profile" << 'EOL'
 
 # Locale configuration (updated by installer)
-export LANG={selected_locale}
-export LC_ALL={selected_locale}
+export LANG={locale}
+export LC_ALL={locale}
 EOL
                 echo "  ✓ Updated $user_home/.profile"
             fi
@@ -478,15 +309,15 @@ verify_configuration() {{
     
     if [[ -f /etc/locale.conf ]]; then
         echo "✓ /etc/locale.conf exists"
-        if grep -q "{selected_locale}" /etc/locale.conf; then
-            echo "✓ Locale {selected_locale} found in /etc/locale.conf"
+        if grep -q "{locale}" /etc/locale.conf; then
+            echo "✓ Locale {locale} found in /etc/locale.conf"
         fi
     fi
     
     if [[ -f /etc/locale.gen ]]; then
         echo "✓ /etc/locale.gen exists"
-        if grep -q "{selected_locale}" /etc/locale.gen; then
-            echo "✓ Locale {selected_locale} found in /etc/locale.gen"
+        if grep -q "{locale}" /etc/locale.gen; then
+            echo "✓ Locale {locale} found in /etc/locale.gen"
         fi
     fi
     
@@ -500,7 +331,7 @@ main() {{
     echo "============================================="
     echo "  Arch Linux Language Configuration Script"
     echo "============================================="
-    echo "Selected locale: {selected_locale}"
+    echo "Selected locale: {locale}"
     echo "Execution environment: arch-chroot (root)"
     echo ""
     
@@ -521,7 +352,7 @@ main() {{
     
     echo ""
     echo "🎉 Language configuration completed successfully!"
-    echo "Selected locale: {selected_locale}"
+    echo "Selected locale: {locale}"
     echo ""
     echo "📋 Configuration summary:"
     echo "  • /etc/locale.conf - System locale configuration"
@@ -530,23 +361,245 @@ main() {{
     echo "  • /etc/systemd/system.conf.d/10-locale.conf - Systemd locale"
     echo "  • /etc/skel/.bashrc and .profile - Default user environment"
     echo ""
-    echo "✅ The system will use {selected_locale} after the next boot"
+    echo "✅ The system will use {locale} after the next boot"
     echo ""
 }}
 
 # Run the main function
 main "$@"
 '''
+
+class LanguageWidget(Gtk.Box):
+
+    def setup_css(self):
+        """Setup CSS styling for buttons"""
+        css_provider = Gtk.CssProvider()
+        css_data = """
+        .back_button {
+            border-radius: 20px;
+            font-weight: bold;
+            font-size: 1em;
+            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
+        }
+        
+        .back_button:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 4px 15px alpha(@theme_bg_color, 0.3);
+        }
+        
+        .back_button:active {
+            transform: translateY(0px);
+        }
+
+        .continue_button {
+            border-radius: 20px;
+            font-weight: bold;
+            font-size: 1em;
+            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+            text-shadow: 0 1px 2px rgba(0,0,0,0.1);
+        }
+        
+        .continue_button:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 4px 15px alpha(@accent_color, 0.3);
+        }
+        
+        .continue_button:active {
+            transform: translateY(0px);
+        }
+        
+        @keyframes pulse {
+            0% { transform: scale(1); }
+            50% { transform: scale(1.05); }
+            100% { transform: scale(1); }
+        }
+        
+        .pulse-animation {
+            animation: pulse 2s ease-in-out infinite;
+        }
+        """
+        css_provider.load_from_data(css_data.encode())
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        get_localization_manager().register_widget(self)
+        self.set_orientation(Gtk.Orientation.VERTICAL)
+        self.set_spacing(20)
+        self.set_margin_top(15)
+        self.set_margin_bottom(15)
+ 
+        # Setup CSS
+        self.setup_css()
+        
+        # A list to hold the language row widgets for easy filtering        
+        # A list to hold the language row widgets for easy filtering
+        self.language_rows = []
+        # Current search text and the locales matching it (None = no filter)
+        self._search_text = ""
+        self._search_matches = None
+        # Pending debounced write of the language script
+        self._pending_write_id = 0
+        # Locale the script on disk was last written for
+        self._last_written_locale = None
+
+        # --- UI Elements ---
+
+        # Main title label
+        title = Gtk.Label()
+        title.set_markup("<span size='xx-large' weight='bold'>" + _("Select a Language") + "</span>")
+        title.set_halign(Gtk.Align.CENTER)
+        self.append(title)
+
+        # --- Adw.Clamp constrains the width of the content ---
+        clamp = Adw.Clamp(margin_start=12, margin_end=12, maximum_size=600)
+        clamp.set_vexpand(True)
+        self.append(clamp)
+
+        # A content box to hold the search and list inside the clamp
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        clamp.set_child(content_box)
+
+        # --- Subtitle Label ---
+        self.subtitle = Gtk.Label(
+            label=_("Select the language you want to use for the system."),
+            halign=Gtk.Align.CENTER
+        )
+        self.subtitle.add_css_class('dim-label')
+        content_box.append(self.subtitle)
+
+        # Search entry to filter languages
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text(_("Search for a language..."))
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        content_box.append(self.search_entry)
+
+        # ScrolledWindow to contain the list of languages
+        scrolled_window = Gtk.ScrolledWindow()
+        scrolled_window.set_has_frame(True)
+        scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled_window.set_vexpand(True)
+        content_box.append(scrolled_window)
+
+        # ListBox to display each language
+        self.list_box = Gtk.ListBox()
+        self.list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
+        self.list_box.get_style_context().add_class("boxed-list")
+
+        # Populate the list with available languages while the list box is
+        # still unparented and unfiltered, so the appends don't queue a resize
+        # up the window or run the filter once per row
+        self.populate_languages()
+        self.list_box.set_filter_func(self._filter_row)
+        scrolled_window.set_child(self.list_box)
+
+        # Action bar at the bottom for navigation buttons
+        action_bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
+        action_bar.set_halign(Gtk.Align.CENTER)
+        self.append(action_bar)
+
+        # The "Back" button
+        self.btn_back = Gtk.Button(label="Back")
+        self.btn_back.add_css_class("back_button")
+        self.btn_back.set_size_request(140, 50)
+        
+        # Add hover effects to back button
+        back_hover = Gtk.EventControllerMotion()
+        back_hover.connect("enter", lambda c, x, y: self.btn_back.add_css_class("pulse-animation"))
+        back_hover.connect("leave", lambda c: self.btn_back.remove_css_class("pulse-animation"))
+        self.btn_back.add_controller(back_hover)
+        
+        action_bar.append(self.btn_back)
+
+
+        # The "Proceed" button
+        self.btn_proceed = Gtk.Button(label="Continue")
+        self.btn_proceed.add_css_class("suggested-action")
+        self.btn_proceed.add_css_class("continue_button")
+        self.btn_proceed.set_size_request(140, 50)
+        self.btn_proceed.set_sensitive(False)
+        
+        # Add hover effects to continue button
+        continue_hover = Gtk.EventControllerMotion()
+        continue_hover.connect("enter", lambda c, x, y: self.btn_proceed.add_css_class("pulse-animation"))
+        continue_hover.connect("leave", lambda c: self.btn_proceed.remove_css_class("pulse-animation"))
+        self.btn_proceed.add_controller(continue_hover)
+        
+        action_bar.append(self.btn_proceed)
+
+        # Connect signal to enable the proceed button upon selection
+        self.list_box.connect("row-selected", self.on_row_selected)
+        # Connected before the installer's own handler, so a write still
+        # pending from the last selection lands before the page changes
+        self.btn_proceed.connect("clicked", self._flush_pending_script)
+
+    def on_continue_clicked(self, button):
+        """Handle the Continue button click"""
+        if self.create_language_script():
+            print(f"Language script created for: {self.get_selected_language_code()}")
+            # You can add navigation to the next widget here
+        else:
+            print("Failed to create language script")
+
+    def country_code_to_emoji(self, country_code):
+        """Converts a two-letter country code to a flag emoji."""
+        return _country_code_to_emoji(country_code)
+
+    def populate_languages(self):
+        for code, text, search_term in _LANGUAGES:
+            row = Gtk.ListBoxRow()
+            # Gtk.Inscription is a lighter text widget than Gtk.Label (no
+            # selection, mnemonics or wrapping), and being no Label it is also
+            # skipped by the localization manager on every language switch
+            label = Gtk.Inscription(
+                text=text, xalign=0, text_overflow=Gtk.InscriptionOverflow.ELLIPSIZE_END,
+                margin_start=10, margin_end=10, margin_top=10, margin_bottom=10
+            )
+            row.set_child(label)
+
+            # Attach metadata to the row for later use
+            row.locale_code = code
+            row.search_term = search_term
+
+            self.list_box.append(row)
+            self.language_rows.append(row)
+
+    def create_language_script(self):
+        """Create a bash script to configure the system language"""
+        selected_locale = self.get_selected_language_code()
+        if not selected_locale:
+            return False
+        if selected_locale == self._last_written_locale:
+            return True
+        
+        try:
+            # Create directory structure in /tmp/installer_config/
+            config_dir = "/tmp/installer_config"
+            os.makedirs(config_dir, exist_ok=True)
             
-            # Save the script
-            script_path = os.path.join(config_dir, "language.sh")
+            # Fill in the bash script for the selected locale
+            script_content = LANGUAGE_SCRIPT_TEMPLATE.format(locale=selected_locale)
             
-            with open(script_path, 'w') as f:
-                f.write(script_content)
+            # Save the script: write a temporary file, then rename it over
+            # the old one so a reader never sees a half-written script
+            script_path = os.path.join(config_dir, "language.sh")
+            tmp_path = script_path + ".tmp"
             
-            # Make the script executable
-            os.chmod(script_path, 0o755)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+            try:
+                # Make the script executable (O_CREAT's mode is masked by umask)
+                os.fchmod(fd, 0o755)
+                os.write(fd, script_content.encode())
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, script_path)
             
+            self._last_written_locale = selected_locale
             print(f"Language configuration script created at: {script_path}")
             return True
             
@@ -556,23 +609,53 @@ main "$@"
 
     def on_search_changed(self, entry):
         search_text = entry.get_text().lower()
-        # Iterate through all rows and set their visibility based on the search term
-        for row in self.language_rows:
-            row.set_visible(search_text in row.search_term)
+        if search_text == self._search_text:
+            return
+
+        if not search_text:
+            matches = None
+        elif self._search_matches is not None and search_text.startswith(self._search_text):
+            # Typing on only narrows the result, so re-check just the current matches
+            matches = {code for code in self._search_matches if search_text in _SEARCH_TERMS[code]}
+        else:
+            matches = {code for code, term in _SEARCH_TERMS.items() if search_text in term}
+
+        self._search_text = search_text
+        self._search_matches = matches
+        self.list_box.invalidate_filter()
+
+    def _filter_row(self, row):
+        return self._search_matches is None or row.locale_code in self._search_matches
 
     def on_row_selected(self, listbox, row):
         """Updated to create language script and update UI language when a language is selected"""
         self.btn_proceed.set_sensitive(row is not None)
         
-        # Create language script when a language is selected
+        if self._pending_write_id:
+            GLib.source_remove(self._pending_write_id)
+            self._pending_write_id = 0
+
+        # Create language script once the selection settles, so scrolling
+        # through the list with the arrow keys doesn't rewrite it per row
         if row is not None:
-            self.create_language_script()
+            self._pending_write_id = GLib.timeout_add(SCRIPT_WRITE_DELAY_MS, self._do_write_script)
             
             # ADD THIS LINE - Update UI language immediately
             selected_locale = self.get_selected_language_code()
             if selected_locale:
                 get_localization_manager().set_language(selected_locale)
 
+    def _do_write_script(self):
+        """Timeout callback: write the script for the row the selection settled on."""
+        self._pending_write_id = 0
+        self.create_language_script()
+        return GLib.SOURCE_REMOVE
+
+    def _flush_pending_script(self, button):
+        if self._pending_write_id:
+            GLib.source_remove(self._pending_write_id)
+            self._do_write_script()
+
     def get_script_path(self):
         """Get the path to the generated language script"""
         return "/tmp/installer_config/language.sh"
@@ -586,9 +669,6 @@ main "$@"
     def execute_language_script(self):
         """Execute the generated language script"""
         try:
-            import subprocess
-            import os
-            
             script_path = self.get_script_path()
             
             if not os.path.exists(script_path):
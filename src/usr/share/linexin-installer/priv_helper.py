@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import subprocess
+import threading
+
+HELPER_PATH = os.path.abspath(__file__)
+
+
+class PrivilegedHelper:
+    """
+    Client for a long-lived root helper process.
+
+    Every 'sudo <cmd>' pays for PAM authentication, passwd lookups and audit
+    logging. The partitioning thread issues a dozen of those back to back, so
+    instead we authenticate once, start this file under sudo and send it one
+    JSON request per command over stdin. If the helper cannot be started (or
+    dies) each call falls back to a plain 'sudo <cmd>', but only when the
+    request never reached it: a command that may already have run is never
+    repeated.
+    """
+
+    def __init__(self):
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Refresh the sudo timestamp and spawn the helper process"""
+        try:
+            subprocess.run(['sudo', '-v'], capture_output=True)
+            self._proc = subprocess.Popen(
+                ['sudo', 'python3', '-u', HELPER_PATH],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True
+            )
+        except Exception as e:
+            print(f"Could not start privileged helper, using sudo per command: {e}")
+            self._proc = None
+
+    def stop(self):
+        """Close the helper's stdin so it exits after the last request"""
+        with self._lock:
+            if self._proc is None:
+                return
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except Exception:
+                self._discard()
+            self._proc = None
+
+    def _discard(self):
+        """Kill and reap a helper that can no longer be used"""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception as e:
+            print(f"Could not stop privileged helper: {e}")
+
+    def _request(self, request):
+        """
+        Send one request to the helper and return its reply.
+
+        Returns None if the request could not be delivered (no helper, or the
+        write failed), in which case nothing ran and the caller may use sudo.
+        Raises RuntimeError if the helper fails after receiving the request,
+        since the command may already have been applied.
+        """
+        if self._proc is None:
+            return None
+        if self._proc.poll() is not None:
+            self._discard()
+            return None
+        try:
+            self._proc.stdin.write(json.dumps(request) + "\n")
+            self._proc.stdin.flush()
+        except OSError as e:
+            print(f"Privileged helper failed, falling back to sudo: {e}")
+            self._discard()
+            return None
+        try:
+            return json.loads(self._proc.stdout.readline())
+        except (OSError, ValueError) as e:
+            self._discard()
+            raise RuntimeError(f"Privileged helper died without replying: {e}") from e
+
+    def run(self, args, input=None, check=False, timeout=None):
+        """
+        Run a command as root.
+
+        Args:
+            args: Command and arguments, without the 'sudo' prefix.
+            input: Optional text passed to the command's stdin.
+            check: Raise CalledProcessError on a non-zero exit status.
+            timeout: Seconds after which the command is killed and
+                subprocess.TimeoutExpired is raised.
+
+        Returns:
+            subprocess.CompletedProcess with captured stdout/stderr text.
+        """
+        args = list(args)
+        with self._lock:
+            reply = self._request({'cmd': args[0], 'args': args[1:], 'stdin': input, 'timeout': timeout})
+            if reply is not None:
+                if reply.get('timed_out'):
+                    raise subprocess.TimeoutExpired(args, timeout, reply['stdout'], reply['stderr'])
+                result = subprocess.CompletedProcess(
+                    args, reply['returncode'], reply['stdout'], reply['stderr']
+                )
+            else:
+                result = subprocess.run(['sudo'] + args, input=input, capture_output=True,
+                                        text=True, timeout=timeout)
+
+        if check:
+            result.check_returncode()
+        return result
+
+    def run_many(self, commands, check=False):
+        """
+        Run several independent commands as root concurrently.
+
+        Args:
+            commands: List of argument lists, without the 'sudo' prefix.
+            check: Raise CalledProcessError if any command fails.
+
+        Returns:
+            List of subprocess.CompletedProcess, in the order of commands.
+        """
+        commands = [list(args) for args in commands]
+        with self._lock:
+            reply = self._request({'batch': [{'cmd': args[0], 'args': args[1:]} for args in commands]})
+            if reply is not None:
+                results = [
+                    subprocess.CompletedProcess(args, r['returncode'], r['stdout'], r['stderr'])
+                    for args, r in zip(commands, reply['results'])
+                ]
+            else:
+                procs = [
+                    subprocess.Popen(['sudo'] + args, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, text=True)
+                    for args in commands
+                ]
+                results = []
+                for args, p in zip(commands, procs):
+                    stdout, stderr = p.communicate()
+                    results.append(subprocess.CompletedProcess(args, p.returncode, stdout, stderr))
+
+        if check:
+            for result in results:
+                result.check_returncode()
+        return results
+
+
+def _run_batch(batch):
+    """Start every command of a batch before waiting on any of them"""
+    procs = []
+    for request in batch:
+        try:
+            procs.append(subprocess.Popen(
+                [request['cmd']] + list(request.get('args', [])),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                close_fds=False,
+                text=True,
+                errors='replace'
+            ))
+        except Exception as e:
+            procs.append(e)
+
+    results = []
+    for proc in procs:
+        if isinstance(proc, Exception):
+            results.append({'returncode': 127, 'stdout': '', 'stderr': str(proc)})
+            continue
+        stdout, stderr = proc.communicate()
+        results.append({'returncode': proc.returncode, 'stdout': stdout, 'stderr': stderr})
+    return {'results': results}
+
+
+def _as_text(output):
+    """TimeoutExpired carries the partial output as bytes even in text mode"""
+    if isinstance(output, bytes):
+        return output.decode(errors='replace')
+    return output or ''
+
+
+def _serve():
+    """Helper side: execute one JSON request per stdin line, reply on stdout"""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if 'batch' in request:
+                sys.stdout.write(json.dumps(_run_batch(request['batch'])) + "\n")
+                sys.stdout.flush()
+                continue
+            stdin_text = request.get('stdin')
+            # Never let a child read the request stream; our own fds are
+            # non-inheritable, so skipping the close_fds sweep is safe.
+            proc = subprocess.run(
+                [request['cmd']] + list(request.get('args', [])),
+                input=stdin_text,
+                stdin=subprocess.DEVNULL if stdin_text is None else None,
+                capture_output=True,
+                close_fds=False,
+                text=True,
+                errors='replace',
+                timeout=request.get('timeout')
+            )
+            reply = {'returncode': proc.returncode, 'stdout': proc.stdout, 'stderr': proc.stderr}
+        except subprocess.TimeoutExpired as e:
+            # subprocess.run has already killed the command
+            reply = {'returncode': None, 'timed_out': True,
+                     'stdout': _as_text(e.stdout), 'stderr': _as_text(e.stderr)}
+        except Exception as e:
+            reply = {'returncode': 127, 'stdout': '', 'stderr': str(e)}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    _serve()
@@ -45,6 +45,8 @@ class SimpleLocalizationManager(GObject.Object):
         self.registered_widgets = []
         self._original_texts = weakref.WeakKeyDictionary()
         self.translations_dir = Path(__file__).parent / "translations"
+        # translated text -> English key, built on first reverse lookup
+        self._english_keys = None
         self.load_translations()
         self._initialized = True
         
@@ -89,15 +91,18 @@ class SimpleLocalizationManager(GObject.Object):
         if translated_text in self.translations.get("en_US.UTF-8", {}):
             return translated_text
         
-        # Search through all non-English translations to find which English key maps to this text
-        for lang_code, trans_dict in self.translations.items():
-            if lang_code == "en_US.UTF-8":
-                continue
-            for english_key, translated_value in trans_dict.items():
-                if translated_value == translated_text:
-                    return english_key
+        # Every label in every registered widget is looked up on each language
+        # switch, most of them (flags, device names, ...) without a match, so
+        # index all non-English translations once instead of scanning them per call
+        if self._english_keys is None:
+            self._english_keys = {}
+            for lang_code, trans_dict in self.translations.items():
+                if lang_code == "en_US.UTF-8":
+                    continue
+                for english_key, translated_value in trans_dict.items():
+                    self._english_keys.setdefault(translated_value, english_key)
         
-        return None
+        return self._english_keys.get(translated_text)
 
     def _get_original(self, widget, field, fallback=None):
         """Fetch original English value for a widget's field if remembered."""
@@ -321,6 +326,7 @@ class SimpleLocalizationManager(GObject.Object):
 
     def load_translations(self):
         """Load translation data from separate files"""
+        self._english_keys = None
         # List of supported languages
         supported_languages = [
             "en_US.UTF-8",
@@ -445,4 +445,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Sicherstellen, dass Timeshift und btrfs-progs auf dem neuen System vorhanden sind",
     "Enabling snapshot automation": "Snapshot-Automatisierung wird aktiviert",
     "Configuring Timeshift and enabling automatic update snapshots": "Timeshift wird konfiguriert und automatische Update-Snapshots werden aktiviert",
+    "Formatting partitions...": "Partitionen werden formatiert...",
+    "Downloading Flatpak apps": "Flatpak-Apps werden heruntergeladen",
+    "Downloading Flatpak apps in the background": "Flatpak-Apps werden im Hintergrund heruntergeladen",
+    "Preparing chroot": "Chroot wird vorbereitet",
+    "Mounting system filesystems inside the new root for the setup scripts": "Systemdateisysteme werden für die Einrichtungsskripte im neuen Root eingehängt",
 }
@@ -813,4 +813,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Ensuring Timeshift and btrfs-progs are present on the new system",
     "Enabling snapshot automation": "Enabling snapshot automation",
     "Configuring Timeshift and enabling automatic update snapshots": "Configuring Timeshift and enabling automatic update snapshots",
+    "Formatting partitions...": "Formatting partitions...",
+    "Downloading Flatpak apps": "Downloading Flatpak apps",
+    "Downloading Flatpak apps in the background": "Downloading Flatpak apps in the background",
+    "Preparing chroot": "Preparing chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "Mounting system filesystems inside the new root for the setup scripts",
 }
@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Asegurando que Timeshift y btrfs-progs estén presentes en el nuevo sistema",
     "Enabling snapshot automation": "Activando la automatización de instantáneas",
     "Configuring Timeshift and enabling automatic update snapshots": "Configurando Timeshift y activando instantáneas automáticas de actualización",
+    "Formatting partitions...": "Formateando particiones...",
+    "Downloading Flatpak apps": "Descargando aplicaciones Flatpak",
+    "Downloading Flatpak apps in the background": "Descargando aplicaciones Flatpak en segundo plano",
+    "Preparing chroot": "Preparando chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "Montando los sistemas de archivos del sistema en la nueva raíz para los scripts de configuración",
 }
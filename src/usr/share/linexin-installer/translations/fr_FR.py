@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Vérification de la présence de Timeshift et btrfs-progs sur le nouveau système",
     "Enabling snapshot automation": "Activation de l'automatisation des instantanés",
     "Configuring Timeshift and enabling automatic update snapshots": "Configuration de Timeshift et activation des instantanés automatiques de mise à jour",
+    "Formatting partitions...": "Formatage des partitions...",
+    "Downloading Flatpak apps": "Téléchargement des applications Flatpak",
+    "Downloading Flatpak apps in the background": "Téléchargement des applications Flatpak en arrière-plan",
+    "Preparing chroot": "Préparation du chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "Montage des systèmes de fichiers système dans la nouvelle racine pour les scripts de configuration",
 }
@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "यह सुनिश्चित किया जा रहा है कि नए सिस्टम पर Timeshift और btrfs-progs मौजूद हों",
     "Enabling snapshot automation": "स्नैपशॉट स्वचालन सक्षम किया जा रहा है",
     "Configuring Timeshift and enabling automatic update snapshots": "Timeshift कॉन्फ़िगर किया जा रहा है और स्वचालित अपडेट स्नैपशॉट सक्षम किए जा रहे हैं",
+    "Formatting partitions...": "पार्टीशन फ़ॉर्मेट किए जा रहे हैं...",
+    "Downloading Flatpak apps": "Flatpak ऐप्स डाउनलोड हो रहे हैं",
+    "Downloading Flatpak apps in the background": "Flatpak ऐप्स पृष्ठभूमि में डाउनलोड हो रहे हैं",
+    "Preparing chroot": "chroot तैयार किया जा रहा है",
+    "Mounting system filesystems inside the new root for the setup scripts": "सेटअप स्क्रिप्ट के लिए नए रूट में सिस्टम फ़ाइल सिस्टम माउंट किए जा रहे हैं",
 }
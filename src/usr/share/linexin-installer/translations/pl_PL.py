@@ -465,4 +465,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Zapewnianie obecności Timeshift i btrfs-progs w nowym systemie",
     "Enabling snapshot automation": "Włączanie automatyzacji migawek",
     "Configuring Timeshift and enabling automatic update snapshots": "Konfigurowanie Timeshift i włączanie automatycznych migawek aktualizacji",
+    "Formatting partitions...": "Formatowanie partycji...",
+    "Downloading Flatpak apps": "Pobieranie aplikacji Flatpak",
+    "Downloading Flatpak apps in the background": "Pobieranie aplikacji Flatpak w tle",
+    "Preparing chroot": "Przygotowywanie chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "Montowanie systemów plików systemu w nowym katalogu głównym dla skryptów konfiguracyjnych",
 }
@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Garantindo que o Timeshift e o btrfs-progs estejam presentes no novo sistema",
     "Enabling snapshot automation": "Ativando a automação de instantâneos",
     "Configuring Timeshift and enabling automatic update snapshots": "Configurando o Timeshift e ativando instantâneos automáticos de atualização",
+    "Formatting partitions...": "Formatando partições...",
+    "Downloading Flatpak apps": "Baixando aplicativos Flatpak",
+    "Downloading Flatpak apps in the background": "Baixando aplicativos Flatpak em segundo plano",
+    "Preparing chroot": "Preparando chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "Montando os sistemas de arquivos do sistema na nova raiz para os scripts de configuração",
 }
@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Garantindo que o Timeshift e o btrfs-progs estejam presentes no novo sistema",
     "Enabling snapshot automation": "Ativando a automação de instantâneos",
     "Configuring Timeshift and enabling automatic update snapshots": "Configurando o Timeshift e ativando instantâneos automáticos de atualização",
+    "Formatting partitions...": "A formatar partições...",
+    "Downloading Flatpak apps": "A transferir aplicações Flatpak",
+    "Downloading Flatpak apps in the background": "A transferir aplicações Flatpak em segundo plano",
+    "Preparing chroot": "A preparar chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "A montar os sistemas de ficheiros do sistema na nova raiz para os scripts de configuração",
 }
@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "Проверка наличия Timeshift и btrfs-progs в новой системе",
     "Enabling snapshot automation": "Включение автоматического создания снимков",
     "Configuring Timeshift and enabling automatic update snapshots": "Настройка Timeshift и включение автоматических снимков при обновлении",
+    "Formatting partitions...": "Форматирование разделов...",
+    "Downloading Flatpak apps": "Загрузка приложений Flatpak",
+    "Downloading Flatpak apps in the background": "Загрузка приложений Flatpak в фоновом режиме",
+    "Preparing chroot": "Подготовка chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "Монтирование системных файловых систем в новом корне для скриптов настройки",
 }
@@ -444,4 +444,9 @@ translations = {
     "Ensuring Timeshift and btrfs-progs are present on the new system": "确保新系统中已安装 Timeshift 和 btrfs-progs",
     "Enabling snapshot automation": "正在启用快照自动化",
     "Configuring Timeshift and enabling automatic update snapshots": "正在配置 Timeshift 并启用自动更新快照",
+    "Formatting partitions...": "正在格式化分区...",
+    "Downloading Flatpak apps": "正在下载 Flatpak 应用",
+    "Downloading Flatpak apps in the background": "正在后台下载 Flatpak 应用",
+    "Preparing chroot": "正在准备 chroot",
+    "Mounting system filesystems inside the new root for the setup scripts": "正在为设置脚本在新根目录中挂载系统文件系统",
 }